@@ -1,147 +1,281 @@
+import argparse
 import torch
 import random
 import numpy as np
-from collections import deque
-from game import SnakeGameAI, Direction, Point
+from game import SnakeGameAI
+from features import game_state, game_states
 from model import Linear_QNet, QTrainer
-from helper import plot
+from replay import ReplayBuffer, PrioritizedReplayBuffer
+from helper import Plotter, PLOT_REFRESH
+from profiler import StageTimer, NULL_TIMER
+from episodes import EpisodeWriter
+from checkpoint import CheckpointManager
 
 MAX_MEMORY = 100_000
 BATCH_SIZE = 1000
 LR = 0.001
+SHORT_EVERY = 1 # env steps per short-memory update (1 = every step, as before)
+CHECKPOINT_EVERY = 100 # games between periodic checkpoints
+
+
+def child_seeds(seed, n):
+    # n independent seeds derived from one run seed, so components seeded
+    # from the same run do not share a random stream (None stays None)
+    if seed is None:
+        return [None] * n
+    return [int(child.generate_state(1)[0]) for child in np.random.SeedSequence(seed).spawn(n)]
+
 
 class Agent:
 
-    def __init__(self):
+    def __init__(self, prioritized=False, short_every=SHORT_EVERY, short_sample=False, seed=None,
+                 memory_size=MAX_MEMORY, memory_path=None, actor_only=False):
+        # actor_only: just the network, its NumPy policy and the exploration
+        # RNGs, for processes that only play (no replay memory, no optimizer)
         self.n_games = 0
+        # own RNGs, so a seeded agent does not depend on (or disturb) the
+        # global random, numpy and torch state; each gets its own child seed
+        rng_seed, np_seed, memory_seed, torch_seed = child_seeds(seed, 4)
+        self.rng = random.Random(rng_seed)
+        self.np_rng = np.random.default_rng(np_seed)
         self.epsilon = 0 # randomness
         self.gamma = 0.9 # discount rate
-        self.memory = deque(maxlen=MAX_MEMORY) # popleft()
-        self.model = Linear_QNet(11, 256, 3)
-        self.trainer = QTrainer(self.model, lr=LR, gamma=self.gamma)
+        self.prioritized = prioritized
+        if actor_only:
+            self.memory = None
+        elif prioritized:
+            self.memory = PrioritizedReplayBuffer(memory_size, seed=memory_seed, path=memory_path) # sampled by TD error
+        else:
+            self.memory = ReplayBuffer(memory_size, seed=memory_seed, path=memory_path) # oldest overwritten when full
+        with torch.random.fork_rng():
+            if torch_seed is not None:
+                torch.manual_seed(torch_seed)
+            self.model = Linear_QNet(11, 256, 3)
+        self.trainer = None if actor_only else QTrainer(self.model, lr=LR, gamma=self.gamma)
+        self.policy = self.model.numpy_policy() # shares the model's weights
+        # short-memory schedule: one optimizer step every short_every env
+        # steps, on those last steps or (short_sample) on a mini-batch of
+        # the same size drawn from memory
+        self.short_every = short_every
+        self.short_sample = short_sample
+        self.short_batch = []
 
 
     def get_state(self, game):
-        head = game.snake[0]
-        point_l = Point(head.x - 20, head.y)
-        point_r = Point(head.x + 20, head.y)
-        point_u = Point(head.x, head.y - 20)
-        point_d = Point(head.x, head.y + 20)
-        
-        dir_l = game.direction == Direction.LEFT
-        dir_r = game.direction == Direction.RIGHT
-        dir_u = game.direction == Direction.UP
-        dir_d = game.direction == Direction.DOWN
-
-        state = [
-            # Danger straight
-            (dir_r and game.is_collision(point_r)) or 
-            (dir_l and game.is_collision(point_l)) or 
-            (dir_u and game.is_collision(point_u)) or 
-            (dir_d and game.is_collision(point_d)),
-
-            # Danger right
-            (dir_u and game.is_collision(point_r)) or 
-            (dir_d and game.is_collision(point_l)) or 
-            (dir_l and game.is_collision(point_u)) or 
-            (dir_r and game.is_collision(point_d)),
-
-            # Danger left
-            (dir_d and game.is_collision(point_r)) or 
-            (dir_u and game.is_collision(point_l)) or 
-            (dir_r and game.is_collision(point_u)) or 
-            (dir_l and game.is_collision(point_d)),
-            
-            # Move direction
-            dir_l,
-            dir_r,
-            dir_u,
-            dir_d,
-            
-            # Food location 
-            game.food.x < game.head.x,  # food left
-            game.food.x > game.head.x,  # food right
-            game.food.y < game.head.y,  # food up
-            game.food.y > game.head.y  # food down
-            ]
-
-        return np.array(state, dtype=int)
+        # [danger straight, right, left, dir l, r, u, d, food l, r, u, d]
+        return game_state(game)
+
+    def get_states(self, games):
+        # float32 (n, 11) tensor batch of the same features for many games
+        return torch.from_numpy(game_states(games))
 
     def remember(self, state, action, reward, next_state, done):
-        self.memory.append((state, action, reward, next_state, done)) # popleft if MAX_MEMORY is reached
+        self.memory.append(state, action, reward, next_state, done) # overwrites the oldest if MAX_MEMORY is reached
 
     def train_long_memory(self):
-        if len(self.memory) > BATCH_SIZE:
-            mini_sample = random.sample(self.memory, BATCH_SIZE) # list of tuples
-        else:
-            mini_sample = self.memory
+        if self.prioritized:
+            batch, idx, weights = self.memory.sample_prioritized(BATCH_SIZE)
+            td_errors = self.trainer.train_step(*batch, weights=weights)
+            self.memory.update_priorities(idx, td_errors.numpy())
+            return
 
-        states, actions, rewards, next_states, dones = zip(*mini_sample)
+        # whole memory if it holds no more than BATCH_SIZE transitions
+        states, actions, rewards, next_states, dones = self.memory.sample(BATCH_SIZE)
         self.trainer.train_step(states, actions, rewards, next_states, dones)
-        #for state, action, reward, nexrt_state, done in mini_sample:
-        #    self.trainer.train_step(state, action, reward, next_state, done)
 
     def train_short_memory(self, state, action, reward, next_state, done):
-        self.trainer.train_step(state, action, reward, next_state, done)
+        if self.short_every == 1:
+            self.trainer.train_step(state, action, reward, next_state, done)
+            return
+
+        self.short_batch.append((state, action, reward, next_state, done))
+        if len(self.short_batch) < self.short_every:
+            return
+        if self.short_sample and len(self.memory) >= self.short_every:
+            self.trainer.train_step(*self.memory.sample(self.short_every))
+        else:
+            states, actions, rewards, next_states, dones = zip(*self.short_batch)
+            self.trainer.train_step(states, actions, rewards, next_states, dones)
+        self.short_batch.clear()
 
     def get_action(self, state):
         # random moves: tradeoff exploration / exploitation
         self.epsilon = 80 - self.n_games
         final_move = [0,0,0]
-        if random.randint(0, 200) < self.epsilon:
-            move = random.randint(0, 2)
+        if self.rng.randint(0, 200) < self.epsilon:
+            move = self.rng.randint(0, 2)
             final_move[move] = 1
         else:
-            state0 = torch.tensor(state, dtype=torch.float)
-            prediction = self.model(state0)
-            move = torch.argmax(prediction).item()
+            move = int(self.policy(state).argmax())
             final_move[move] = 1
 
         return final_move
 
+    def get_actions(self, states):
+        # get_action for a batch of states: one-hot (n, 3) int8 moves
+        states = np.asarray(states, dtype=np.float32)
+        n = len(states)
+        self.epsilon = 80 - self.n_games
+        moves = self.policy(states).argmax(axis=1)
+        explore = self.np_rng.integers(0, 201, n) < self.epsilon
+        moves[explore] = self.np_rng.integers(0, 3, explore.sum())
+        final_moves = np.zeros((n, 3), dtype=np.int8)
+        final_moves[np.arange(n), moves] = 1
+        return final_moves
 
-def train():
-    plot_scores = []
-    plot_mean_scores = []
-    total_score = 0
-    record = 0
-    agent = Agent()
-    game = SnakeGameAI()
-    while True:
-        # get old state
-        state_old = agent.get_state(game)
 
-        # get move
-        final_move = agent.get_action(state_old)
+def step(agent, game, timer=NULL_TIMER):
+    # one move of the training loop: act, learn, remember and, when the game
+    # ends, reset it and train long memory. Returns (done, score).
+    timer.start()
+
+    # get old state
+    state_old = agent.get_state(game)
+    timer.lap('get_state')
+
+    # get move
+    final_move = agent.get_action(state_old)
+    timer.lap('get_action')
 
-        # perform move and get new state
-        reward, done, score = game.play_step(final_move)
-        state_new = agent.get_state(game)
+    # perform move and get new state (includes rendering when not headless)
+    reward, done, score = game.play_step(final_move)
+    timer.lap('play_step')
+    state_new = agent.get_state(game)
+    timer.lap('get_state')
 
-        # train short memory
-        agent.train_short_memory(state_old, final_move, reward, state_new, done)
+    # train short memory
+    agent.train_short_memory(state_old, final_move, reward, state_new, done)
+    timer.lap('train_short_memory')
 
-        # remember
-        agent.remember(state_old, final_move, reward, state_new, done)
+    # remember
+    agent.remember(state_old, final_move, reward, state_new, done)
+    timer.lap('remember')
+    timer.count('steps')
 
-        if done:
-            # train long memory, plot result
-            game.reset()
-            agent.n_games += 1
-            agent.train_long_memory()
+    if done:
+        # train long memory
+        game.reset()
+        agent.n_games += 1
+        timer.lap('play_step')
+        agent.train_long_memory()
+        timer.lap('train_long_memory')
+        timer.count('episodes')
 
-            if score > record:
-                record = score
-                agent.model.save()
+    return done, score
+
+
+def train(render=True, prioritized=False, plot=True, plot_refresh=PLOT_REFRESH,
+          short_every=SHORT_EVERY, short_sample=False, profile=False, profile_log=None,
+          seed=None, episode_log=None, resume=False, checkpoint_every=CHECKPOINT_EVERY,
+          save_memory=False, memory_size=MAX_MEMORY, memory_path=None):
+    plotter = Plotter(enabled=plot, refresh=plot_refresh)
+    timer = StageTimer(enabled=profile, log_file=profile_log)
+    total_score = 0
+    record = 0
+    agent_seed, game_seed = child_seeds(seed, 2)
+    agent = Agent(prioritized=prioritized, short_every=short_every, short_sample=short_sample,
+                  seed=agent_seed, memory_size=memory_size, memory_path=memory_path)
+    checkpoints = CheckpointManager(include_memory=save_memory)
+    if resume:
+        counters = checkpoints.resume(agent)
+        record = counters['record']
+        total_score = counters['total_score']
+        print('Resumed from game', agent.n_games, 'Record:', record)
+    game = SnakeGameAI(render=render, seed=game_seed)
+    episodes = EpisodeWriter(episode_log, game.w, game.h) if episode_log else None
+    # training is usually stopped with Ctrl-C: persist what the run collected
+    try:
+        while True:
+            done, score = step(agent, game, timer)
+            if done:
+                if episodes:
+                    episodes.write(*game.last_episode)
+                total_score += score
+                if score > record:
+                    record = score
+                    checkpoints.save(agent, best=True, record=record, total_score=total_score)
+                    timer.lap('save')
+                if agent.n_games % checkpoint_every == 0:
+                    checkpoints.save(agent, record=record, total_score=total_score)
+                    timer.lap('save')
 
-            print('Game', agent.n_games, 'Score', score, 'Record:', record)
+                print('Game', agent.n_games, 'Score', score, 'Record:', record)
 
-            plot_scores.append(score)
-            total_score += score
-            mean_score = total_score / agent.n_games
-            plot_mean_scores.append(mean_score)
-            plot(plot_scores, plot_mean_scores)
+                mean_score = total_score / agent.n_games
+                plotter.add(score, mean_score)
+                timer.lap('log_and_plot')
+            timer.maybe_report()
+    finally:
+        # a last periodic checkpoint, so a resume picks up from here
+        if agent.n_games:
+            checkpoints.save(agent, record=record, total_score=total_score)
+        elif agent.memory.path is not None:
+            agent.memory.flush()
+        checkpoints.close()
+        if episodes:
+            episodes.close()
 
 
 if __name__ == '__main__':
-    train()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Train the snake agent')
+    parser.add_argument('--headless', action='store_true',
+                        help='do not open the game window (much faster training; '
+                             '--workers always runs headless)')
+    parser.add_argument('--prioritized', action='store_true',
+                        help='sample replay memory by TD error instead of uniformly')
+    parser.add_argument('--workers', type=int, default=0,
+                        help='collect experience in this many headless worker processes')
+    parser.add_argument('--no-plot', action='store_true',
+                        help='do not show the training progress plot')
+    parser.add_argument('--plot-refresh', type=float, default=PLOT_REFRESH,
+                        help='seconds between plot redraws (default: %(default)s)')
+    parser.add_argument('--short-every', type=int, default=SHORT_EVERY,
+                        help='steps between short-memory updates (default: %(default)s)')
+    parser.add_argument('--short-sample', action='store_true',
+                        help='short-memory updates use a mini-batch sampled from memory '
+                             'instead of the last --short-every steps')
+    parser.add_argument('--profile', action='store_true',
+                        help='print a per-stage timing breakdown every 10 seconds')
+    parser.add_argument('--profile-log', default=None,
+                        help='also append each breakdown as a JSON line to this file')
+    parser.add_argument('--seed', type=int, default=None,
+                        help='seed the game and the agent for a reproducible run')
+    parser.add_argument('--episode-log', default=None,
+                        help='record every game (seed + moves) to this file, appending to an '
+                             'existing log; replay it with python episodes.py FILE')
+    parser.add_argument('--resume', action='store_true',
+                        help='continue from the latest checkpoint in model/checkpoints')
+    parser.add_argument('--checkpoint-every', type=int, default=CHECKPOINT_EVERY,
+                        help='games between checkpoints (default: %(default)s)')
+    parser.add_argument('--save-memory', action='store_true',
+                        help='include the replay memory in checkpoints')
+    parser.add_argument('--memory-size', type=int, default=MAX_MEMORY,
+                        help='replay memory capacity in transitions (default: %(default)s)')
+    parser.add_argument('--memory-path', default=None,
+                        help='keep the replay memory in memory-mapped files in this folder '
+                             '(reused by later runs)')
+    args = parser.parse_args()
+    plot_args = dict(plot=not args.no_plot, plot_refresh=args.plot_refresh)
+    if args.workers > 0:
+        # the learner only trains on whole chunks, nothing runs per step
+        unsupported = [flag for flag, used in (
+            ('--short-every', args.short_every != SHORT_EVERY),
+            ('--short-sample', args.short_sample),
+            ('--profile', args.profile),
+            ('--profile-log', args.profile_log is not None),
+            ('--episode-log', args.episode_log is not None),
+        ) if used]
+        if unsupported:
+            parser.error(f"{', '.join(unsupported)} cannot be used with --workers")
+        from parallel import train_parallel
+        train_parallel(args.workers, prioritized=args.prioritized, **plot_args, seed=args.seed,
+                       resume=args.resume, checkpoint_every=args.checkpoint_every,
+                       save_memory=args.save_memory, memory_size=args.memory_size,
+                       memory_path=args.memory_path)
+    else:
+        train(render=not args.headless, prioritized=args.prioritized, **plot_args,
+              short_every=args.short_every, short_sample=args.short_sample,
+              profile=args.profile or args.profile_log is not None, profile_log=args.profile_log,
+              seed=args.seed, episode_log=args.episode_log, resume=args.resume,
+              checkpoint_every=args.checkpoint_every, save_memory=args.save_memory,
+              memory_size=args.memory_size, memory_path=args.memory_path)
@@ -0,0 +1,258 @@
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import torch
+
+try:
+    import resource
+except ImportError: # Windows
+    resource = None
+
+from agent import Agent, BATCH_SIZE, step
+from game import SnakeGameAI
+
+# Headless throughput benchmarks for the training hot path. Every benchmark
+# runs in its own interpreter (so its peak memory is its own), starts from the
+# same seed, times each call separately and reports calls/s plus latency
+# percentiles; results are printed and written to JSON so runs can be compared:
+#   python benchmark.py --out before.json
+#   python benchmark.py --out after.json
+# Startup is timed in fresh interpreters against a target per entry point.
+
+# name: (code run in a fresh interpreter, reference, target). The reference is
+# the third-party cost the entry point cannot avoid: importing pygame (which
+# pulls in numpy) and opening its window, or the first torch optimizer (which
+# imports torch._dynamo). The target is then the most the code may add to the
+# reference's median, as a fraction of it, so it holds on slow and fast
+# machines alike. Without a reference the target is seconds for the median.
+STARTUP = {
+    'headless_env': ("from game import SnakeGameAI; SnakeGameAI(render=False)", None, 0.1),
+    'manual_game': ("from snake import SnakeGame; SnakeGame()",
+                    "import pygame; pygame.display.set_mode((640, 480))", 0.1),
+    'headless_agent': ("from agent import Agent; Agent()",
+                       "import torch; torch.optim.Adam([torch.zeros(1, requires_grad=True)])", 0.05),
+}
+
+
+def seed_all(seed):
+    random.seed(seed)
+    np.random.seed(seed)
+    torch.manual_seed(seed)
+
+
+def peak_rss_mb():
+    # peak resident memory of this process so far (ru_maxrss is KB on Linux),
+    # None where the resource module does not exist
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def summarize(latencies, **extra):
+    lat = np.asarray(latencies)
+    total = lat.sum()
+    result = {
+        'calls': len(lat),
+        'total_s': float(total),
+        'calls_per_s': float(len(lat) / total) if total > 0 else float('inf'),
+        'mean_us': float(lat.mean() * 1e6),
+        'p50_us': float(np.percentile(lat, 50) * 1e6),
+        'p90_us': float(np.percentile(lat, 90) * 1e6),
+        'p99_us': float(np.percentile(lat, 99) * 1e6),
+        'max_us': float(lat.max() * 1e6),
+    }
+    result.update(extra)
+    return result
+
+
+def random_move():
+    final_move = [0, 0, 0]
+    final_move[random.randint(0, 2)] = 1
+    return final_move
+
+
+def fill_memory(agent, game, n):
+    # play n random moves into agent.memory
+    for _ in range(n):
+        state_old = agent.get_state(game)
+        final_move = random_move()
+        reward, done, score = game.play_step(final_move)
+        agent.remember(state_old, final_move, reward, agent.get_state(game), done)
+        if done:
+            game.reset()
+
+
+def bench_play_step(n, seed):
+    game = SnakeGameAI(render=False, seed=seed)
+    lat = np.empty(n)
+    for i in range(n):
+        final_move = random_move()
+        t = time.perf_counter()
+        _, done, _ = game.play_step(final_move)
+        lat[i] = time.perf_counter() - t
+        if done:
+            game.reset()
+    return summarize(lat)
+
+
+def bench_get_state(n, seed):
+    agent = Agent(seed=seed)
+    game = SnakeGameAI(render=False, seed=seed)
+    lat = np.empty(n)
+    for i in range(n):
+        t = time.perf_counter()
+        agent.get_state(game)
+        lat[i] = time.perf_counter() - t
+        _, done, _ = game.play_step(random_move())
+        if done:
+            game.reset()
+    return summarize(lat)
+
+
+def bench_train_step(n, batch_size, seed):
+    agent = Agent(seed=seed)
+    game = SnakeGameAI(render=False, seed=seed)
+    fill_memory(agent, game, max(batch_size, 5000))
+    lat = np.empty(n)
+    for i in range(n):
+        batch = agent.memory.sample(batch_size)
+        t = time.perf_counter()
+        agent.trainer.train_step(*batch)
+        lat[i] = time.perf_counter() - t
+    return summarize(lat, batch_size=batch_size,
+                     transitions_per_s=float(n * batch_size / lat.sum()))
+
+
+def bench_train_long_memory(n, seed):
+    agent = Agent(seed=seed)
+    game = SnakeGameAI(render=False, seed=seed)
+    fill_memory(agent, game, 20_000)
+    lat = np.empty(n)
+    for i in range(n):
+        t = time.perf_counter()
+        agent.train_long_memory()
+        lat[i] = time.perf_counter() - t
+    return summarize(lat, batch_size=BATCH_SIZE)
+
+
+def bench_train_loop(n, seed):
+    # agent.train without printing, plotting or saving
+    agent = Agent(seed=seed)
+    game = SnakeGameAI(render=False, seed=seed)
+    lat = np.empty(n)
+    for i in range(n):
+        t = time.perf_counter()
+        step(agent, game)
+        lat[i] = time.perf_counter() - t
+    total = lat.sum()
+    return summarize(lat, steps_per_s=float(n / total),
+                     transitions_per_s=float(len(agent.memory) / total),
+                     optimizer_steps_per_s=float(agent.trainer.n_steps / total),
+                     games=agent.n_games)
+
+
+def time_startup(code):
+    # time from before the first import until code has run, in a new
+    # interpreter; windows go to SDL's dummy driver
+    env = dict(os.environ, SDL_VIDEODRIVER='dummy', SDL_AUDIODRIVER='dummy')
+    timed = f"import time; t = time.perf_counter(); {code}; print(time.perf_counter() - t)"
+    cwd = os.path.dirname(os.path.abspath(__file__))
+    return float(subprocess.run([sys.executable, '-c', timed], capture_output=True, text=True,
+                                check=True, cwd=cwd, env=env).stdout.split()[-1])
+
+
+def bench_startup(code, reference, target, runs=5):
+    if reference is None:
+        lat = [time_startup(code) for _ in range(runs)]
+        return summarize(lat, target_s=target, meets_target=bool(np.median(lat) <= target))
+    # interleaved, so drift in machine load hits both medians alike
+    lat, ref = [], []
+    for _ in range(runs):
+        lat.append(time_startup(code))
+        ref.append(time_startup(reference))
+    overhead = float(np.median(lat) / np.median(ref) - 1)
+    return summarize(lat, reference_p50_us=float(np.median(ref) * 1e6), overhead=overhead,
+                     target_overhead=target, meets_target=overhead <= target)
+
+
+def benchmarks(steps, seed):
+    return {
+        'play_step': lambda: bench_play_step(steps, seed),
+        'get_state': lambda: bench_get_state(steps, seed),
+        'train_step_1': lambda: bench_train_step(steps // 10, 1, seed),
+        'train_step_1000': lambda: bench_train_step(max(steps // 1000, 10), BATCH_SIZE, seed),
+        'train_long_memory': lambda: bench_train_long_memory(max(steps // 1000, 10), seed),
+        'train_loop': lambda: bench_train_loop(steps // 10, seed),
+    }
+
+
+def run_one(name, steps, seed):
+    # one benchmark in this process; peak_rss_mb includes the interpreter
+    # and its imports, which are the same for every benchmark
+    seed_all(seed)
+    result = benchmarks(steps, seed)[name]()
+    result['peak_rss_mb'] = peak_rss_mb()
+    return result
+
+
+def run(steps, seed):
+    results = {}
+    for name in benchmarks(steps, seed):
+        # a fresh interpreter per benchmark: ru_maxrss never goes down, so
+        # in-process it would report the peak of every benchmark before
+        out = subprocess.run([sys.executable, os.path.abspath(__file__), '--only', name,
+                              '--steps', str(steps), '--seed', str(seed)],
+                             capture_output=True, text=True, check=True).stdout
+        r = results[name] = json.loads(out.splitlines()[-1])
+        peak = 'n/a' if r['peak_rss_mb'] is None else f"{r['peak_rss_mb']:.0f} MB"
+        print(f"{name:<18} {r['calls_per_s']:>12.0f}/s  p50 {r['p50_us']:>9.1f} us  "
+              f"p99 {r['p99_us']:>9.1f} us  peak {peak}")
+    for name, (code, reference, target) in STARTUP.items():
+        r = results['startup_' + name] = bench_startup(code, reference, target)
+        if reference is None:
+            goal = f"target {target * 1000:.0f} ms"
+        else:
+            goal = (f"{r['overhead']:+.0%} over {r['reference_p50_us'] / 1000:.0f} ms "
+                    f"reference, target {target:+.0%}")
+        print(f"{'startup_' + name:<18} p50 {r['p50_us'] / 1000:>7.0f} ms  {goal}  "
+              f"{'ok' if r['meets_target'] else 'MISSED'}")
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the training hot path')
+    parser.add_argument('--steps', type=int, default=20_000,
+                        help='calls for the per-step benchmarks (default: %(default)s)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', default='benchmark.json',
+                        help='JSON file for the results (default: %(default)s)')
+    parser.add_argument('--only', default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.only:
+        # child of run(): one benchmark, result as JSON on stdout
+        print(json.dumps(run_one(args.only, args.steps, args.seed)))
+        sys.exit()
+
+    results = run(args.steps, args.seed)
+    report = {
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'seed': args.seed,
+        'steps': args.steps,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'torch': torch.__version__,
+        'platform': platform.platform(),
+        'results': results,
+    }
+    with open(args.out, 'w') as f:
+        json.dump(report, f, indent=2)
+    print('Results written to', args.out)
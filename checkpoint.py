@@ -0,0 +1,106 @@
+import copy
+import glob
+import os
+from concurrent.futures import ThreadPoolExecutor
+import torch
+
+# Training checkpoints. save() snapshots everything needed to resume (model
+# and Adam state, counters, the agent's RNG states and optionally the replay
+# memory) on the calling thread, which only costs a few tensor copies, and
+# hands the file write to a background thread. Files are written under a
+# temporary name and moved into place with os.replace, so a crash never
+# leaves a half-written checkpoint behind. The last `keep` periodic
+# checkpoints are kept, plus best.pth for the highest score.
+
+CHECKPOINT_FOLDER = './model/checkpoints'
+
+
+class CheckpointManager:
+
+    def __init__(self, folder=CHECKPOINT_FOLDER, keep=3, include_memory=False):
+        self.folder = folder
+        self.keep = keep
+        self.include_memory = include_memory
+        os.makedirs(folder, exist_ok=True)
+        # one writer thread, so checkpoints land in the order they were taken
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='checkpoint')
+        self.pending = None
+
+    def snapshot(self, agent, **counters):
+        state = {
+            'model': {k: v.detach().clone() for k, v in agent.model.state_dict().items()},
+            'optimizer': copy.deepcopy(agent.trainer.optimizer.state_dict()),
+            'n_games': agent.n_games,
+            'rng': agent.rng.getstate(),
+            'np_rng': agent.np_rng.bit_generator.state,
+            'counters': counters,
+        }
+        if agent.memory.path is not None:
+            # memory-mapped memory persists itself, just make the files current
+            agent.memory.flush()
+        elif self.include_memory:
+            state['memory'] = agent.memory.state_dict()
+        return state
+
+    def save(self, agent, best=False, **counters):
+        # counters: anything else train needs to resume (record, total_score...)
+        state = self.snapshot(agent, **counters)
+        name = 'best.pth' if best else f'checkpoint_{agent.n_games:08d}.pth'
+        self.pending = self.executor.submit(self._write, state, name, not best)
+        return self.pending
+
+    def _write(self, state, name, prune):
+        path = os.path.join(self.folder, name)
+        tmp = path + '.tmp'
+        torch.save(state, tmp)
+        os.replace(tmp, path)
+        if prune:
+            for old in self.checkpoints()[:-self.keep]:
+                os.remove(old)
+
+    def wait(self):
+        if self.pending is not None:
+            self.pending.result()
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+
+    def checkpoints(self):
+        # periodic checkpoints, oldest first
+        return sorted(glob.glob(os.path.join(self.folder, 'checkpoint_*.pth')))
+
+    def latest(self):
+        paths = self.checkpoints()
+        return paths[-1] if paths else None
+
+    def best(self):
+        path = os.path.join(self.folder, 'best.pth')
+        return path if os.path.exists(path) else None
+
+    def resume(self, agent):
+        # load the latest checkpoint into agent and return its counters.
+        # record comes from best.pth when that is higher: periodic
+        # checkpoints can predate the best game, and resuming with a lower
+        # record would let a worse game overwrite best.pth
+        counters = self.load(agent) or {'record': 0, 'total_score': 0}
+        best = self.best()
+        if best is not None:
+            best_record = torch.load(best, weights_only=False)['counters']['record']
+            counters['record'] = max(counters['record'], best_record)
+        return counters
+
+    def load(self, agent, path=None):
+        # restore agent from path (the latest checkpoint by default) and
+        # return the saved counters, or None if there is nothing to load
+        path = path or self.latest()
+        if path is None:
+            return None
+        state = torch.load(path, weights_only=False)
+        agent.model.load_state_dict(state['model'])
+        agent.trainer.optimizer.load_state_dict(state['optimizer'])
+        agent.n_games = state['n_games']
+        agent.rng.setstate(state['rng'])
+        agent.np_rng.bit_generator.state = state['np_rng']
+        if 'memory' in state:
+            agent.memory.load_state_dict(state['memory'])
+        return state['counters']
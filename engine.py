@@ -0,0 +1,220 @@
+import random
+from enum import Enum
+from collections import namedtuple, deque
+
+# Pure game logic for the AI snake. Nothing in here touches pygame, so it can
+# be imported and stepped headlessly as fast as Python allows; rendering is
+# attached on top as an observer (see game.py).
+
+class Direction(Enum):
+    RIGHT = 1
+    LEFT = 2
+    UP = 3
+    DOWN = 4
+
+Point = namedtuple('Point', 'x, y')
+
+BLOCK_SIZE = 20
+
+# [straight, right, left] turns are applied on this order
+CLOCK_WISE = [Direction.RIGHT, Direction.DOWN, Direction.LEFT, Direction.UP]
+
+
+class Board:
+    # Occupancy grid over the cells of a w x h pixel area. Each cell holds how
+    # many snake segments sit on it, so membership is O(1) and stays correct
+    # for the single frame where a new head overlaps the body.
+    # Free cells are also kept in a swap-remove array (free + slot, the
+    # position of every cell inside free or -1), so a uniform draw among the
+    # empty cells is O(1) however long the snake gets.
+
+    def __init__(self, w, h, block_size=BLOCK_SIZE):
+        self.block_size = block_size
+        self.cols = w // block_size
+        self.rows = h // block_size
+        self.clear()
+
+    def contains(self, pt):
+        return 0 <= pt.x < self.cols * self.block_size and 0 <= pt.y < self.rows * self.block_size
+
+    def index(self, pt):
+        return int(pt.y) // self.block_size * self.cols + int(pt.x) // self.block_size
+
+    def point(self, index):
+        return Point(index % self.cols * self.block_size, index // self.cols * self.block_size)
+
+    def count(self, pt):
+        return self.cells[self.index(pt)]
+
+    def occupy(self, pt):
+        i = self.index(pt)
+        if self.cells[i] == 0:
+            # swap-remove i from the free array
+            pos = self.slot[i]
+            last = self.free.pop()
+            if last != i:
+                self.free[pos] = last
+                self.slot[last] = pos
+            self.slot[i] = -1
+        self.cells[i] += 1
+
+    def release(self, pt):
+        i = self.index(pt)
+        self.cells[i] -= 1
+        if self.cells[i] == 0:
+            self.slot[i] = len(self.free)
+            self.free.append(i)
+
+    def free_count(self):
+        return len(self.free)
+
+    def random_free(self, rng=random):
+        # uniform draw among the empty cells, None when the board is full
+        if not self.free:
+            return None
+        return self.point(self.free[rng.randrange(len(self.free))])
+
+    def clear(self):
+        n = self.cols * self.rows
+        self.cells = bytearray(n)
+        self.free = list(range(n))
+        self.slot = list(range(n))
+
+
+class SnakeEngine:
+    # All randomness (food placement) comes from a per-episode Random seeded
+    # from the engine's own seeded stream, and every move is recorded in
+    # self.actions (0 straight, 1 right, 2 left). (episode_seed, actions) is
+    # therefore enough to replay an episode exactly: see episodes.py.
+
+    def __init__(self, w=640, h=480, seed=None):
+        self.w = w
+        self.h = h
+        self.observers = []
+        self.board = Board(w, h)
+        self.rng = random.Random(seed)
+        self.actions = bytearray()
+        self.last_episode = None
+        self.reset()
+
+    def attach(self, observer):
+        # observers get observer.update(engine) after every step that
+        # does not end the game, and observer.reset(engine) on reset
+        self.observers.append(observer)
+
+    def detach(self, observer):
+        self.observers.remove(observer)
+
+    def reset(self, seed=None):
+        # keep (seed, actions, score) of the episode that just ended
+        if self.actions:
+            self.last_episode = (self.episode_seed, bytes(self.actions), self.score)
+        if seed is None:
+            seed = self.rng.getrandbits(32)
+        self.episode_seed = seed
+        self.food_rng = random.Random(seed)
+        self.actions = bytearray()
+
+        # init game state
+        self.direction = Direction.RIGHT
+
+        self.head = Point(self.w/2, self.h/2)
+        self.snake = deque([self.head,
+                            Point(self.head.x-BLOCK_SIZE, self.head.y),
+                            Point(self.head.x-(2*BLOCK_SIZE), self.head.y)])
+        self.board.clear()
+        for pt in self.snake:
+            self.board.occupy(pt)
+
+        self.score = 0
+        self.food = None
+        self._place_food()
+        self.frame_iteration = 0
+        for observer in self.observers:
+            observer.reset(self)
+
+    def _place_food(self):
+        # returns False when there is no free cell left (the snake fills the board)
+        food = self.board.random_free(self.food_rng)
+        if food is None:
+            return False
+        self.food = food
+        return True
+
+    def play_step(self, action):
+        self.frame_iteration += 1
+
+        # 1. move
+        self._move(action) # update the head
+        self.snake.appendleft(self.head)
+        if self.board.contains(self.head):
+            self.board.occupy(self.head)
+
+        # 2. check if game over
+        reward = 0
+        game_over = False
+        if self.is_collision() or self.frame_iteration > 100*len(self.snake):
+            game_over = True
+            reward = -10
+            return reward, game_over, self.score
+
+        # 3. place new food or just move
+        if self.head == self.food:
+            self.score += 1
+            reward = 10
+            if not self._place_food():
+                # board full: the game is won, the food stays under the head
+                game_over = True
+                return reward, game_over, self.score
+        else:
+            self.board.release(self.snake.pop())
+
+        # 4. let the attached observers (renderers) catch up
+        for observer in self.observers:
+            observer.update(self)
+        # 5. return game over and score
+        return reward, game_over, self.score
+
+    def is_collision(self, pt=None):
+        if pt is None:
+            pt = self.head
+        # hits boundary
+        if pt.x > self.w - BLOCK_SIZE or pt.x < 0 or pt.y > self.h - BLOCK_SIZE or pt.y < 0:
+            return True
+        # hits itself (the head's own cell only counts if something else is there too)
+        hits = self.board.count(pt)
+        if pt == self.head:
+            hits -= 1
+        if hits > 0:
+            return True
+
+        return False
+
+    def _move(self, action):
+        # [straight, right, left]
+        idx = CLOCK_WISE.index(self.direction)
+
+        if action[0]:
+            new_dir = CLOCK_WISE[idx] # no change
+            self.actions.append(0)
+        elif action[1]:
+            new_dir = CLOCK_WISE[(idx + 1) % 4] # right turn r -> d -> l -> u
+            self.actions.append(1)
+        else: # [0, 0, 1]
+            new_dir = CLOCK_WISE[(idx - 1) % 4] # left turn r -> u -> l -> d
+            self.actions.append(2)
+
+        self.direction = new_dir
+
+        x = self.head.x
+        y = self.head.y
+        if self.direction == Direction.RIGHT:
+            x += BLOCK_SIZE
+        elif self.direction == Direction.LEFT:
+            x -= BLOCK_SIZE
+        elif self.direction == Direction.DOWN:
+            y += BLOCK_SIZE
+        elif self.direction == Direction.UP:
+            y -= BLOCK_SIZE
+
+        self.head = Point(x, y)
@@ -0,0 +1,112 @@
+import argparse
+import os
+import struct
+import time
+from engine import SnakeEngine
+
+# Compact binary episode log. A SnakeEngine episode is fully determined by
+# its episode seed and its moves, so that is all that is stored:
+#   header  MAGIC, board width and height (uint16 each)
+#   episode seed, final score, number of moves (uint32 each), then the moves
+#           packed 2 bits each, 4 per byte (0 straight, 1 right, 2 left)
+# A 1000-move episode takes 262 bytes. replay() runs the moves back through a
+# headless engine, as fast as SnakeEngine.play_step allows.
+
+MAGIC = b'SNAKELOG'
+_HEADER = struct.Struct('<HH')
+_EPISODE = struct.Struct('<III')
+
+MOVES = ([1, 0, 0], [0, 1, 0], [0, 0, 1])
+
+
+def pack_actions(actions):
+    packed = bytearray((len(actions) + 3) // 4)
+    for i, a in enumerate(actions):
+        packed[i >> 2] |= a << ((i & 3) * 2)
+    return bytes(packed)
+
+
+def unpack_actions(packed, n):
+    return bytes((packed[i >> 2] >> ((i & 3) * 2)) & 3 for i in range(n))
+
+
+class EpisodeWriter:
+
+    def __init__(self, path, w=640, h=480):
+        # an existing log for the same board is appended to (a resumed run
+        # keeps its earlier episodes), anything else is not overwritten
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            with open(path, 'rb') as f:
+                head = f.read(len(MAGIC) + _HEADER.size)
+            if head != MAGIC + _HEADER.pack(w, h):
+                raise ValueError(f'{path} exists and is not a snake episode log for a {w}x{h} board')
+            self.file = open(path, 'ab')
+        else:
+            self.file = open(path, 'wb')
+            self.file.write(MAGIC + _HEADER.pack(w, h))
+
+    def write(self, seed, actions, score):
+        self.file.write(_EPISODE.pack(seed, score, len(actions)) + pack_actions(actions))
+        self.file.flush() # training is usually stopped with Ctrl-C
+
+    def close(self):
+        self.file.close()
+
+
+def read_episodes(path):
+    # ((w, h), iterator of (seed, actions, score)) for the episodes in a log
+    f = open(path, 'rb')
+    if f.read(len(MAGIC)) != MAGIC:
+        f.close()
+        raise ValueError(f'{path} is not a snake episode log')
+    return _HEADER.unpack(f.read(_HEADER.size)), _iter_episodes(f)
+
+
+def _iter_episodes(f):
+    with f:
+        while True:
+            head = f.read(_EPISODE.size)
+            if len(head) < _EPISODE.size:
+                return
+            seed, score, n = _EPISODE.unpack(head)
+            yield seed, unpack_actions(f.read((n + 3) // 4), n), score
+
+
+def replay(seed, actions, engine=None, w=640, h=480):
+    # play the moves of one episode again; returns the engine, left in the
+    # state of the last move
+    if engine is None:
+        engine = SnakeEngine(w, h)
+    engine.reset(seed)
+    for a in actions:
+        _, done, _ = engine.play_step(MOVES[a])
+        if done:
+            break
+    return engine
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Replay a snake episode log headlessly')
+    parser.add_argument('log')
+    parser.add_argument('--render', action='store_true', help='watch the games in a window')
+    args = parser.parse_args()
+
+    (w, h), episodes = read_episodes(args.log)
+    if args.render:
+        from game import SnakeGameAI
+        engine = SnakeGameAI(w, h)
+    else:
+        engine = SnakeEngine(w, h)
+
+    n_games = n_moves = mismatches = 0
+    start = time.perf_counter()
+    for seed, actions, score in episodes:
+        replay(seed, actions, engine)
+        n_games += 1
+        n_moves += len(actions)
+        if engine.score != score:
+            mismatches += 1
+            print('Game', n_games, 'seed', seed, 'replayed score', engine.score, 'logged', score)
+    elapsed = time.perf_counter() - start
+    print(f'{n_games} games, {n_moves} moves replayed in {elapsed:.2f} s '
+          f'({n_moves / max(elapsed, 1e-9):.0f} moves/s), {mismatches} mismatches')
@@ -0,0 +1,97 @@
+import numpy as np
+from engine import CLOCK_WISE, BLOCK_SIZE
+
+# The 11 state features of Agent.get_state computed with array ops for one or
+# many games at once. Games are described by arrays in grid cells:
+#   direction (n,) index into DELTAS (R, D, L, U, engine.CLOCK_WISE order)
+#   head, food (n, 2) as (col, row)
+#   occupied  (n, rows, cols), nonzero where a snake segment sits
+# Every per-direction decision is a lookup table indexed by direction, so
+# there is no branching per game. For a single SnakeEngine, game_state reads
+# the same tables from plain Python, which beats NumPy's per-call overhead.
+
+# Cell offsets for each direction, in engine.CLOCK_WISE order (R, D, L, U)
+DELTAS = np.array([[1, 0], [0, 1], [-1, 0], [0, -1]], dtype=np.int32)
+
+# Offsets of the cells straight ahead, to the right and to the left
+DANGER_OFFSETS = DELTAS[np.array([[d, (d + 1) % 4, (d - 1) % 4] for d in range(4)])]
+
+# Move direction features in get_state order [left, right, up, down]
+DIRECTION_FEATURES = np.array([[0, 1, 0, 0],   # right
+                               [0, 0, 0, 1],   # down
+                               [1, 0, 0, 0],   # left
+                               [0, 0, 1, 0]],  # up
+                              dtype=np.uint8)
+
+N_FEATURES = 11
+
+DIRECTION_INDEX = {d: i for i, d in enumerate(CLOCK_WISE)}
+
+
+def danger(pts, occupied):
+    # (n, k, 2) cells -> (n, k) bool, True if off the board or on the body
+    n, rows, cols = occupied.shape
+    x, y = pts[..., 0], pts[..., 1]
+    inside = (x >= 0) & (x < cols) & (y >= 0) & (y < rows)
+    cell = np.where(inside, y * cols + x, 0)
+    hit = np.take_along_axis(occupied.reshape(n, -1), cell.reshape(n, -1), axis=1)
+    return ~inside | (hit.reshape(inside.shape) != 0)
+
+
+def state_features(direction, head, food, occupied, dtype=np.float32):
+    # (n, 11) batch of states, same features and order as Agent.get_state
+    states = np.empty((len(direction), N_FEATURES), dtype=dtype)
+    # danger straight, right, left
+    states[:, 0:3] = danger(head[:, None, :] + DANGER_OFFSETS[direction], occupied)
+    # move direction
+    states[:, 3:7] = DIRECTION_FEATURES[direction]
+    # food location
+    states[:, 7] = food[:, 0] < head[:, 0]  # food left
+    states[:, 8] = food[:, 0] > head[:, 0]  # food right
+    states[:, 9] = food[:, 1] < head[:, 1]  # food up
+    states[:, 10] = food[:, 1] > head[:, 1]  # food down
+    return states
+
+
+def engine_arrays(games):
+    # (direction, head, food, occupied) arrays for a list of SnakeEngines of
+    # the same size. The occupancy grid of a single game is a zero-copy view
+    # of its Board.
+    direction = np.array([DIRECTION_INDEX[g.direction] for g in games], dtype=np.intp)
+    head = np.array([(g.head.x, g.head.y) for g in games], dtype=np.int32) // BLOCK_SIZE
+    food = np.array([(g.food.x, g.food.y) for g in games], dtype=np.int32) // BLOCK_SIZE
+    board = games[0].board
+    if len(games) == 1:
+        occupied = np.frombuffer(board.cells, dtype=np.uint8)[None]
+    else:
+        occupied = np.stack([np.frombuffer(g.board.cells, dtype=np.uint8) for g in games])
+    return direction, head, food, occupied.reshape(len(games), board.rows, board.cols)
+
+
+# plain-Python copies of the tables for game_state
+_DANGER_OFFSETS = DANGER_OFFSETS.tolist()
+_DIRECTION_FEATURES = DIRECTION_FEATURES.tolist()
+
+
+def game_state(game):
+    # (11,) float32 state of one SnakeEngine
+    d = DIRECTION_INDEX[game.direction]
+    board = game.board
+    cols, rows, cells = board.cols, board.rows, board.cells
+    hx = int(game.head.x) // BLOCK_SIZE
+    hy = int(game.head.y) // BLOCK_SIZE
+    state = []
+    for dx, dy in _DANGER_OFFSETS[d]:
+        x = hx + dx
+        y = hy + dy
+        state.append(not (0 <= x < cols and 0 <= y < rows) or cells[y * cols + x] != 0)
+    state += _DIRECTION_FEATURES[d]
+    food = game.food
+    head = game.head
+    state += (food.x < head.x, food.x > head.x, food.y < head.y, food.y > head.y)
+    return np.array(state, dtype=np.float32)
+
+
+def game_states(games):
+    # (n, 11) float32 states of a list of SnakeEngines
+    return state_features(*engine_arrays(games))
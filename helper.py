@@ -1,41 +1,99 @@
-import matplotlib.pyplot as plt
-from IPython import display
+import multiprocessing as mp
+import queue
+import time
 
-# Configurar un estilo más atractivo pero manteniendo todo lo demás igual
-plt.style.use('dark_background')
+# Training progress plot. Plotter runs the matplotlib figure in its own
+# process: the training loop only puts (score, mean_score) on a queue, which
+# never blocks, and the plot process appends them to the existing lines and
+# redraws at most once every `refresh` seconds, so the cost per game stays
+# constant no matter how long training runs.
 
-plt.ion()
+PLOT_REFRESH = 0.5 # seconds between redraws
 
-def plot(scores, mean_scores):
-    display.clear_output(wait=True)
-    display.display(plt.gcf())
-    plt.clf()
-    
-    # Fondo y estilo mejorados
+
+class Plotter:
+
+    def __init__(self, enabled=True, refresh=PLOT_REFRESH):
+        self.enabled = enabled
+        self.queue = None
+        self.process = None
+        if enabled:
+            ctx = mp.get_context('spawn')
+            self.queue = ctx.Queue()
+            self.process = ctx.Process(target=_plot_loop, args=(self.queue, refresh), daemon=True)
+            self.process.start()
+
+    def add(self, score, mean_score):
+        if self.enabled:
+            self.queue.put((score, mean_score))
+
+    def close(self):
+        if self.enabled:
+            self.queue.put(None)
+            self.process.join()
+            self.enabled = False
+
+
+def _plot_loop(q, refresh):
+    import matplotlib.pyplot as plt
+
+    # Configurar un estilo más atractivo pero manteniendo todo lo demás igual
+    plt.style.use('dark_background')
+    plt.ion()
+
+    fig = plt.figure()
     ax = plt.gca()
     ax.set_facecolor('#1E1E1E')  # Fondo más oscuro
-    
+
     # Títulos mejorados pero con el mismo texto
     plt.title('Training...', color='white', fontsize=14)
     plt.xlabel('Number of Games', color='white')
     plt.ylabel('Score', color='white')
-    
+
     # Usar colores más atractivos para las líneas
-    plt.plot(scores, color='#00CFFF')  # Azul brillante
-    plt.plot(mean_scores, color='#FF5757')  # Rojo coral
-    
-    # Mantener el mismo límite del eje Y
-    plt.ylim(ymin=0)
-    
-    # Mejorar la visualización de los valores pero mantener la misma lógica
-    if len(scores) > 0:
-        plt.text(len(scores)-1, scores[-1], str(scores[-1]), color='#00CFFF')
-    if len(mean_scores) > 0:
-        plt.text(len(mean_scores)-1, mean_scores[-1], str(mean_scores[-1]), color='#FF5757')
-    
+    score_line, = plt.plot([], [], color='#00CFFF')  # Azul brillante
+    mean_line, = plt.plot([], [], color='#FF5757')  # Rojo coral
+    score_text = plt.text(0, 0, '', color='#00CFFF')
+    mean_text = plt.text(0, 0, '', color='#FF5757')
+
     # Una cuadrícula sutil para mejorar la visualización
     plt.grid(True, linestyle='--', alpha=0.3)
-    
-    # Mantener exactamente las mismas llamadas originales
     plt.show(block=False)
-    plt.pause(.1)
\ No newline at end of file
+
+    scores = []
+    mean_scores = []
+    running = True
+    while running:
+        # take everything queued since the last redraw
+        new = False
+        while True:
+            try:
+                item = q.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                running = False
+                break
+            scores.append(item[0])
+            mean_scores.append(item[1])
+            new = True
+
+        # the window may have been closed: keep draining, stop drawing
+        if new and plt.fignum_exists(fig.number):
+            x = range(len(scores))
+            score_line.set_data(x, scores)
+            mean_line.set_data(x, mean_scores)
+            score_text.set_position((len(scores)-1, scores[-1]))
+            score_text.set_text(str(scores[-1]))
+            mean_text.set_position((len(mean_scores)-1, mean_scores[-1]))
+            mean_text.set_text(str(mean_scores[-1]))
+            ax.relim()
+            ax.autoscale_view()
+            # Mantener el mismo límite del eje Y
+            ax.set_ylim(bottom=0)
+            fig.canvas.draw_idle()
+
+        if plt.fignum_exists(fig.number):
+            plt.pause(refresh)
+        else:
+            time.sleep(refresh)
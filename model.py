@@ -2,6 +2,8 @@ import torch
 import torch.nn as nn
 import torch.optim as optim
 import torch.nn.functional as F
+import numpy as np
+import time
 import os
 
 class Linear_QNet(nn.Module):
@@ -23,6 +25,29 @@ class Linear_QNet(nn.Module):
         file_name = os.path.join(model_folder_path, file_name)
         torch.save(self.state_dict(), file_name)
 
+    def numpy_policy(self):
+        return NumpyQNet(self)
+
+
+class NumpyQNet:
+    # NumPy-only forward of a Linear_QNet, for action selection without the
+    # per-call torch overhead. The weights are views of the model's (CPU)
+    # parameters, not copies, so they follow every in-place optimizer step
+    # and load_state_dict with no re-export.
+
+    def __init__(self, model):
+        self.w1 = model.linear1.weight.detach().numpy().T
+        self.b1 = model.linear1.bias.detach().numpy()
+        self.w2 = model.linear2.weight.detach().numpy().T
+        self.b2 = model.linear2.bias.detach().numpy()
+
+    def __call__(self, x):
+        # (11,) or (n, 11) states -> (3,) or (n, 3) Q values
+        h = np.asarray(x, dtype=np.float32) @ self.w1
+        h += self.b1
+        np.maximum(h, 0, out=h)
+        return h @ self.w2 + self.b2
+
 
 class QTrainer:
     def __init__(self, model, lr, gamma):
@@ -31,12 +56,18 @@ class QTrainer:
         self.model = model
         self.optimizer = optim.Adam(model.parameters(), lr=self.lr)
         self.criterion = nn.MSELoss()
+        self.last_step_time = 0.0
+        self.n_steps = 0 # optimizer steps taken
 
-    def train_step(self, state, action, reward, next_state, done):
-        state = torch.tensor(state, dtype=torch.float)
-        next_state = torch.tensor(next_state, dtype=torch.float)
-        action = torch.tensor(action, dtype=torch.long)
-        reward = torch.tensor(reward, dtype=torch.float)
+    def train_step(self, state, action, reward, next_state, done, weights=None):
+        # weights: optional per-sample importance-sampling weights (prioritized
+        # replay). Returns the TD error of every sample, detached.
+        start = time.perf_counter()
+        state = _as_tensor(state, torch.float)
+        next_state = _as_tensor(next_state, torch.float)
+        action = _as_tensor(action, torch.long)
+        reward = _as_tensor(reward, torch.float)
+        done = _as_tensor(done, torch.bool)
         # (n, x)
 
         if len(state.shape) == 1:
@@ -45,27 +76,40 @@ class QTrainer:
             next_state = torch.unsqueeze(next_state, 0)
             action = torch.unsqueeze(action, 0)
             reward = torch.unsqueeze(reward, 0)
-            done = (done, )
+            done = torch.unsqueeze(done, 0)
 
         # 1: predicted Q values with current state
         pred = self.model(state)
 
-        target = pred.clone()
-        for idx in range(len(done)):
-            Q_new = reward[idx]
-            if not done[idx]:
-                Q_new = reward[idx] + self.gamma * torch.max(self.model(next_state[idx]))
-
-            target[idx][torch.argmax(action[idx]).item()] = Q_new
-    
         # 2: Q_new = r + y * max(next_predicted Q value) -> only do this if not done
+        # one forward pass for the whole batch of next states
+        next_q = self.model(next_state).max(dim=1).values
+        Q_new = torch.where(done, reward, reward + self.gamma * next_q)
+
         # pred.clone()
         # preds[argmax(action)] = Q_new
+        target = pred.clone()
+        rows = torch.arange(len(target))
+        cols = action.argmax(dim=1)
+        target[rows, cols] = Q_new
+
         self.optimizer.zero_grad()
-        loss = self.criterion(target, pred)
+        if weights is None:
+            loss = self.criterion(target, pred)
+        else:
+            # same MSE, but each sample's error scaled by its weight
+            loss = (weights * ((target - pred) ** 2).mean(dim=1)).mean()
         loss.backward()
 
         self.optimizer.step()
+        self.n_steps += 1
+        # wall time of the last call, to keep an eye on long-memory training cost
+        self.last_step_time = time.perf_counter() - start
+        return (Q_new - pred[rows, cols]).detach()
 
 
-
+def _as_tensor(data, dtype):
+    # accepts tensors, arrays, lists and tuples of arrays (as zipped from memory)
+    if isinstance(data, torch.Tensor):
+        return data.to(dtype)
+    return torch.as_tensor(np.asarray(data), dtype=dtype)
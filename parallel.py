@@ -0,0 +1,129 @@
+import numpy as np
+import torch
+import torch.multiprocessing as mp
+from game import SnakeGameAI
+from model import Linear_QNet
+from agent import Agent, CHECKPOINT_EVERY, MAX_MEMORY, child_seeds
+from helper import Plotter, PLOT_REFRESH
+from checkpoint import CheckpointManager
+
+# Actor/learner training. Every worker process plays its own headless
+# SnakeGameAI with a local copy of the network and streams transitions in
+# chunks through a queue; the learner process owns the replay memory and the
+# QTrainer, trains on every chunk it receives and publishes its weights to a
+# shared-memory model that the workers copy from every sync_every steps.
+# Collection scales with the number of cores; the learner does no
+# per-step short-memory updates, only batched long-memory ones.
+
+CHUNK_SIZE = 256 # transitions per queue message
+SYNC_EVERY = 1000 # worker steps between weight syncs
+
+
+def _sync(local, shared, lock):
+    with lock, torch.no_grad():
+        for dst, src in zip(local.parameters(), shared.parameters()):
+            dst.copy_(src)
+
+
+def _worker(shared_model, lock, queue, n_games, chunk_size, sync_every, seed):
+    torch.set_num_threads(1)
+    agent_seed, game_seed = child_seeds(seed, 2)
+    agent = Agent(seed=agent_seed, actor_only=True)
+    game = SnakeGameAI(render=False, seed=game_seed)
+    _sync(agent.model, shared_model, lock)
+
+    states, actions, rewards, next_states, dones, scores = [], [], [], [], [], []
+    steps = 0
+    while True:
+        # exploration follows the learner's global game count
+        agent.n_games = n_games.value
+        state_old = agent.get_state(game)
+        final_move = agent.get_action(state_old)
+        reward, done, score = game.play_step(final_move)
+        state_new = agent.get_state(game)
+
+        states.append(state_old)
+        actions.append(final_move)
+        rewards.append(reward)
+        next_states.append(state_new)
+        dones.append(done)
+        if done:
+            game.reset()
+            scores.append(score)
+
+        steps += 1
+        if len(rewards) == chunk_size:
+            queue.put((np.array(states, dtype=np.uint8), np.array(actions, dtype=np.int8),
+                       np.array(rewards, dtype=np.float32), np.array(next_states, dtype=np.uint8),
+                       np.array(dones, dtype=bool), scores))
+            states, actions, rewards, next_states, dones, scores = [], [], [], [], [], []
+        if steps % sync_every == 0:
+            _sync(agent.model, shared_model, lock)
+
+
+def train_parallel(n_workers, prioritized=False, chunk_size=CHUNK_SIZE, sync_every=SYNC_EVERY,
+                   plot=True, plot_refresh=PLOT_REFRESH, seed=None, resume=False,
+                   checkpoint_every=CHECKPOINT_EVERY, save_memory=False, memory_size=MAX_MEMORY,
+                   memory_path=None):
+    ctx = mp.get_context('spawn')
+    plotter = Plotter(enabled=plot, refresh=plot_refresh)
+    total_score = 0
+    record = 0
+    learner_seed, *worker_seeds = child_seeds(seed, n_workers + 1)
+    agent = Agent(prioritized=prioritized, seed=learner_seed, memory_size=memory_size, memory_path=memory_path)
+    checkpoints = CheckpointManager(include_memory=save_memory)
+    if resume:
+        counters = checkpoints.resume(agent)
+        record = counters['record']
+        total_score = counters['total_score']
+        print('Resumed from game', agent.n_games, 'Record:', record)
+
+    shared_model = Linear_QNet(11, 256, 3)
+    shared_model.load_state_dict(agent.model.state_dict())
+    shared_model.share_memory()
+    lock = ctx.Lock()
+    n_games = ctx.Value('i', agent.n_games)
+    # bounded, so workers block instead of piling up memory if the learner lags
+    queue = ctx.Queue(maxsize=4 * n_workers)
+
+    workers = [ctx.Process(target=_worker, daemon=True,
+                           args=(shared_model, lock, queue, n_games, chunk_size, sync_every,
+                                 worker_seed))
+               for worker_seed in worker_seeds]
+    for w in workers:
+        w.start()
+
+    try:
+        while True:
+            states, actions, rewards, next_states, dones, scores = queue.get()
+            agent.memory.extend(states, actions, rewards, next_states, dones)
+            agent.train_long_memory()
+            _sync(shared_model, agent.model, lock)
+
+            for score in scores:
+                agent.n_games += 1
+                total_score += score
+                if score > record:
+                    record = score
+                    checkpoints.save(agent, best=True, record=record, total_score=total_score)
+
+                if agent.n_games % checkpoint_every == 0:
+                    checkpoints.save(agent, record=record, total_score=total_score)
+
+                print('Game', agent.n_games, 'Score', score, 'Record:', record)
+
+                mean_score = total_score / agent.n_games
+                plotter.add(score, mean_score)
+            if scores:
+                n_games.value = agent.n_games
+    finally:
+        for w in workers:
+            w.terminate()
+        for w in workers:
+            w.join()
+        # a last periodic checkpoint, so a resume picks up from here
+        if agent.n_games:
+            checkpoints.save(agent, record=record, total_score=total_score)
+        elif agent.memory.path is not None:
+            agent.memory.flush()
+        checkpoints.close()
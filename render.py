@@ -0,0 +1,395 @@
+import math
+import os
+from functools import lru_cache
+import pygame
+from engine import BLOCK_SIZE
+
+# Retained, dirty-rect rendering of a snake board, shared by game.py and
+# snake.py. The display keeps last frame's pixels; each frame only the cells
+# that changed are repainted and only those rects are sent to
+# pygame.display.update():
+#   - the head, and the tail while it slides out of the cell it left (both
+#     move between cells when the caller interpolates between steps)
+#   - the previous head, which joins the body and loses its eyes
+#   - the segments that moved into a new gradient bucket: the gradient is
+#     quantized to GRADIENT_BUCKETS steps along the snake, so one move only
+#     changes one segment per bucket boundary instead of every segment
+#   - the food and its animated glow, and the text overlays they touch
+# A repaint restores the background under the dirty rect, draws the snake
+# cells inside it, then the head and tail, the food and the texts on top, in
+# the same order as a full redraw. Growing (all bucket boundaries move) or
+# anything that is not a single step forward falls back to a full redraw.
+# Snake cells and food frames are pre-rendered sprites and texts are
+# rendered only when they change, so a repaint is a handful of blits.
+# PygameRenderer puts a BoardRenderer in a window to watch SnakeGameAI.
+
+GRADIENT_BUCKETS = 16
+
+WHITE = (255, 255, 255)
+RED = (200, 0, 0)
+LIGHT_RED = (255, 100, 100)
+BLUE1 = (0, 0, 255)
+BLUE2 = (0, 100, 255)
+BLACK = (0, 0, 0)
+GRID_COLOR = (20, 20, 20)
+
+SPEED = 40  # frames per second when watching SnakeGameAI
+
+# eye centres relative to the head cell, by direction name
+_EYE_X = 5
+_EYE_Y = 8
+EYES = {
+    'RIGHT': ((BLOCK_SIZE - _EYE_X, _EYE_Y), (BLOCK_SIZE - _EYE_X, BLOCK_SIZE - _EYE_Y)),
+    'LEFT': ((_EYE_X, _EYE_Y), (_EYE_X, BLOCK_SIZE - _EYE_Y)),
+    'UP': ((_EYE_Y, _EYE_X), (BLOCK_SIZE - _EYE_Y, _EYE_X)),
+    'DOWN': ((_EYE_Y, BLOCK_SIZE - _EYE_X), (BLOCK_SIZE - _EYE_Y, BLOCK_SIZE - _EYE_X)),
+}
+
+
+def gradient_bucket(i, length, buckets=GRADIENT_BUCKETS):
+    return i * buckets // length
+
+
+def bucket_intensity(bucket, buckets=GRADIENT_BUCKETS):
+    # same 1 -> 1/3 fade along the snake as the per-segment gradient
+    return max(0.3, 1 - bucket / (buckets * 1.5))
+
+
+def draw_segment(surface, x, y, primary, secondary, intensity):
+    color = (int(primary[0] * intensity), int(primary[1] * intensity), int(primary[2] * intensity))
+    inner_color = (int(secondary[0] * intensity), int(secondary[1] * intensity), int(secondary[2] * intensity))
+    pygame.draw.rect(surface, color, pygame.Rect(x, y, BLOCK_SIZE, BLOCK_SIZE), border_radius=3)
+    pygame.draw.rect(surface, inner_color, pygame.Rect(x+4, y+4, 12, 12), border_radius=2)
+
+
+def draw_eyes(surface, x, y, direction_name):
+    for ex, ey in EYES[direction_name]:
+        pygame.draw.circle(surface, WHITE, (x + ex, y + ey), 2)
+
+
+def segment_sprite(primary, secondary, bucket, eyes=None):
+    # one cell of the snake, drawn once per (colours, bucket, eyes) and then
+    # only blitted; the rounded corners stay transparent
+    key = (primary, secondary, bucket, eyes)
+    sprite = _segment_sprites.get(key)
+    if sprite is None:
+        sprite = _new_sprite(BLOCK_SIZE, BLOCK_SIZE)
+        draw_segment(sprite, 0, 0, primary, secondary, bucket_intensity(bucket))
+        if eyes is not None:
+            draw_eyes(sprite, 0, 0, eyes)
+        _segment_sprites[key] = sprite
+    return sprite
+
+
+_segment_sprites = {}
+
+
+def _new_sprite(w, h):
+    sprite = pygame.Surface((w, h), pygame.SRCALPHA)
+    if pygame.display.get_surface() is not None:
+        sprite = sprite.convert_alpha()
+    return sprite
+
+
+# The food pulses with sin(5t) and its glow with sin(3t), so the animation
+# repeats every 2*pi; it is pre-rendered as FOOD_FRAMES frames over that
+# period and drawn with a single blit.
+FOOD_FRAMES = 64
+
+
+def food_frame(t):
+    # (sprite, offset of the sprite from the food cell) at animation time t
+    if not _food_strip:
+        for k in range(FOOD_FRAMES):
+            _food_strip.append(_render_food(2 * math.pi * k / FOOD_FRAMES))
+    return _food_strip[int(t / (2 * math.pi) * FOOD_FRAMES) % FOOD_FRAMES]
+
+
+_food_strip = []
+
+
+def _render_food(t):
+    # pulsing food with a glow and a highlight
+    pulse = (math.sin(t * 5) + 1) / 4 + 0.75  # Value between 0.75 and 1.25
+    food_color = (int(RED[0] * pulse), int(RED[1] * pulse), int(RED[2] * pulse))
+
+    r = int(BLOCK_SIZE * (1 + 0.3 * math.sin(t * 3)))
+    sprite = _new_sprite(2 * r, 2 * r)
+    pygame.draw.circle(sprite, (*LIGHT_RED, 40), (r, r), r)
+
+    x = y = r - BLOCK_SIZE//2
+    pygame.draw.rect(sprite, food_color, pygame.Rect(x, y, BLOCK_SIZE, BLOCK_SIZE), border_radius=BLOCK_SIZE//2)
+    pygame.draw.rect(sprite, LIGHT_RED, pygame.Rect(x+2, y+2, BLOCK_SIZE-4, BLOCK_SIZE-4), border_radius=BLOCK_SIZE//2-1)
+    pygame.draw.circle(sprite, WHITE, (x + 5, y + 5), 3)
+    return sprite, -x
+
+
+def food_rect(food, t):
+    # area touched by the food and its glow at animation time t
+    sprite, offset = food_frame(t)
+    return sprite.get_rect(topleft=(food.x + offset, food.y + offset))
+
+
+def draw_food(surface, food, t):
+    sprite, offset = food_frame(t)
+    surface.blit(sprite, (food.x + offset, food.y + offset))
+
+
+def draw_snake(surface, snake, direction, primary, secondary, eyes=True):
+    length = len(snake)
+    for i, pt in enumerate(snake):
+        eye = direction.name if eyes and i == 0 else None
+        surface.blit(segment_sprite(primary, secondary, gradient_bucket(i, length), eye), (pt.x, pt.y))
+
+
+FONT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'arial.ttf')
+
+
+@lru_cache(maxsize=None)
+def get_font(size):
+    # fonts are loaded the first time something draws text, not at import,
+    # and from next to this file rather than the working directory
+    pygame.font.init()
+    return pygame.font.Font(FONT_PATH, size)
+
+
+@lru_cache(maxsize=256)
+def render_text(font, text, color):
+    # shared cache of rendered text: labels, titles and shadows are drawn
+    # from the same surfaces instead of calling font.render every frame
+    return font.render(text, True, color)
+
+
+class TextOverlay:
+    # a line of text with a drop shadow, re-rendered only when it changes.
+    # anchor is the pygame.Rect attribute placed at position ('topleft',
+    # 'topright', 'center'...)
+
+    def __init__(self, font, position, anchor='topleft', shadow_color=(30, 30, 30), shadow_offset=2):
+        self.font = font
+        self.position = position
+        self.anchor = anchor
+        self.shadow_color = shadow_color
+        self.shadow_offset = shadow_offset
+        self.text = None
+        self.rect = None
+
+    def set_text(self, text):
+        # returns the rect the old text covered if the text changed, else None
+        if text == self.text:
+            return None
+        old = self.rect
+        self.text = text
+        self.surface = render_text(self.font, text, WHITE)
+        self.shadow = render_text(self.font, text, self.shadow_color)
+        self.text_rect = self.surface.get_rect(**{self.anchor: self.position})
+        self.shadow_rect = self.text_rect.move(self.shadow_offset, self.shadow_offset)
+        self.rect = self.text_rect.union(self.shadow_rect)
+        return old or self.rect
+
+    def draw(self, surface):
+        surface.blit(self.shadow, self.shadow_rect)
+        surface.blit(self.surface, self.text_rect)
+
+
+class BoardRenderer:
+
+    def __init__(self, display, background, primary, secondary, texts=()):
+        self.display = display
+        self.background = background
+        self.screen = display.get_rect()
+        self.primary = primary
+        self.secondary = secondary
+        self.texts = list(texts)
+        self.invalidate()
+
+    def invalidate(self):
+        # forget what is on screen: the next draw() is a full redraw
+        self.drawn = {}  # body cell -> (bucket, None)
+        self.head = None
+        self.tail = None
+        self.prev_tail = None  # cell the tail left on the last step
+        self.moved = False  # a step was seen, so there is something to interpolate
+        self.length = 0
+        self.sprites = []  # (key, rect) of the head and the sliding tail
+        self.food_area = None
+
+    def set_palette(self, primary, secondary):
+        if (primary, secondary) != (self.primary, self.secondary):
+            self.primary = primary
+            self.secondary = secondary
+            self.invalidate()
+
+    def _align(self, rect):
+        # grow rect to whole cells, so cells repainted inside it stay inside it
+        left = rect.left // BLOCK_SIZE * BLOCK_SIZE
+        top = rect.top // BLOCK_SIZE * BLOCK_SIZE
+        right = -(-rect.right // BLOCK_SIZE) * BLOCK_SIZE
+        bottom = -(-rect.bottom // BLOCK_SIZE) * BLOCK_SIZE
+        return pygame.Rect(left, top, right - left, bottom - top).clip(self.screen)
+
+    @staticmethod
+    def _lerp(a, b, alpha):
+        return pygame.Rect(round(a.x + (b.x - a.x) * alpha), round(a.y + (b.y - a.y) * alpha),
+                           BLOCK_SIZE, BLOCK_SIZE)
+
+    def draw(self, snake, direction, food, t, texts=(), alpha=1.0):
+        # texts: one string per TextOverlay, in the same order.
+        # alpha: how far the last step is shown, from 0 (the previous state)
+        # to 1 (the current one); the body is drawn on the grid, the head
+        # slides in from the neck and the tail out of the cell it left.
+        length = len(snake)
+        stepped = self.head is not None and snake[0] != self.head
+        if stepped:
+            self.prev_tail = self.tail if length == self.length else None
+            self.moved = True
+        if not self.moved:
+            alpha = 1.0
+        full = self.head is None or length != self.length or stepped and (
+            length < 2 or snake[1] != self.head)
+
+        changed = []
+        if full:
+            self.drawn = {}
+            for i in range(1, length):
+                pt = snake[i]
+                self.drawn[(pt.x, pt.y)] = (gradient_bucket(i, length), None)
+        elif stepped:
+            # one step forward: drop the old tail, add the old head to the
+            # body and update the segments that crossed into a new gradient
+            # bucket
+            tail = (self.tail.x, self.tail.y)
+            self.drawn.pop(tail, None)
+            changed.append(tail)
+            indices = {1}
+            indices.update(-(-k * length // GRADIENT_BUCKETS) for k in range(1, GRADIENT_BUCKETS))
+            for i in indices:
+                if i < length:
+                    pt = snake[i]
+                    cell = (pt.x, pt.y)
+                    key = (gradient_bucket(i, length), None)
+                    if self.drawn.get(cell) != key:
+                        self.drawn[cell] = key
+                        changed.append(cell)
+        self.head = snake[0]
+        self.tail = snake[-1]
+        self.length = length
+
+        sprites = []
+        if alpha < 1 and self.prev_tail is not None:
+            sprites.append(((gradient_bucket(length - 1, length), None),
+                            self._lerp(self.prev_tail, snake[-1], alpha)))
+        neck = snake[1] if length > 1 else snake[0]
+        sprites.append(((0, direction.name), self._lerp(neck, snake[0], alpha)))
+
+        # dirty area: changed cells, old and new food area, moved sprites and
+        # changed texts
+        food_area = food_rect(food, t)
+        if full:
+            dirty = [self.screen]
+        else:
+            dirty = [pygame.Rect(x, y, BLOCK_SIZE, BLOCK_SIZE) for x, y in changed]
+            dirty.append(self._align(food_area.union(self.food_area) if self.food_area else food_area))
+            if sprites != self.sprites:
+                dirty.extend(self._align(rect) for _, rect in self.sprites + sprites)
+        self.food_area = food_area
+        self.sprites = sprites
+
+        for overlay, text in zip(self.texts, texts):
+            old = overlay.set_text(text)
+            if old is not None and not full:
+                dirty.append(self._align(old.union(overlay.rect)))
+
+        # whatever is drawn over the grid is repainted whole, so sprites and
+        # texts touching the dirty area bring their cells into it
+        layers = [rect for _, rect in sprites] + [overlay.rect for overlay in self.texts]
+        touched = [full] * len(layers)
+        while not full:
+            new = [i for i, rect in enumerate(layers) if not touched[i] and rect.collidelist(dirty) != -1]
+            if not new:
+                break
+            for i in new:
+                touched[i] = True
+                dirty.append(self._align(layers[i]))
+
+        # repaint, bottom layer first
+        for rect in dirty:
+            self.display.blit(self.background, rect, rect)
+        if full:
+            cells = self.drawn.items()
+        else:
+            cells = self._cells_in(dirty)
+        for cell, key in cells:
+            self.display.blit(segment_sprite(self.primary, self.secondary, *key), cell)
+        for (key, rect), hit in zip(sprites, touched):
+            if hit:
+                self.display.blit(segment_sprite(self.primary, self.secondary, *key), rect)
+        draw_food(self.display, food, t)
+        for overlay, hit in zip(self.texts, touched[len(sprites):]):
+            if hit:
+                overlay.draw(self.display)
+
+        if full:
+            pygame.display.flip()
+        else:
+            pygame.display.update(dirty)
+
+    def _cells_in(self, rects):
+        seen = set()
+        for rect in rects:
+            for x in range(rect.left, rect.right, BLOCK_SIZE):
+                for y in range(rect.top, rect.bottom, BLOCK_SIZE):
+                    key = self.drawn.get((x, y))
+                    if key is not None and (x, y) not in seen:
+                        seen.add((x, y))
+                        yield (x, y), key
+
+
+class PygameRenderer:
+    # Observer that draws a SnakeEngine after every step. Attach it to an
+    # engine to watch the game; leave it off to train headless.
+
+    def __init__(self, w, h, speed=SPEED):
+        self.w = w
+        self.h = h
+        self.speed = speed
+        # init display
+        self.display = pygame.display.set_mode((self.w, self.h))
+        pygame.display.set_caption('Snake AI')
+        self.clock = pygame.time.Clock()
+        # Create surfaces for effects
+        self.background = pygame.Surface((self.w, self.h))
+        self.draw_background_grid()
+        self.time = 0
+        # only the cells that change are redrawn each frame
+        self.board = BoardRenderer(self.display, self.background, BLUE1, BLUE2,
+                                   texts=[TextOverlay(get_font(25), (0, 0), shadow_color=(50, 50, 50))])
+
+    def draw_background_grid(self):
+        # Draw a subtle grid pattern in the background
+        self.background.fill(BLACK)
+        for x in range(0, self.w, BLOCK_SIZE):
+            pygame.draw.line(self.background, GRID_COLOR, (x, 0), (x, self.h))
+        for y in range(0, self.h, BLOCK_SIZE):
+            pygame.draw.line(self.background, GRID_COLOR, (0, y), (self.w, y))
+
+    def reset(self, game):
+        self.time = 0
+        self.board.invalidate()
+
+    def update(self, game):
+        self.time += 0.1  # Increment time for animations
+
+        # collect user input
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                pygame.quit()
+                quit()
+
+        # update ui and clock
+        self._update_ui(game)
+        self.clock.tick(self.speed)
+
+    def _update_ui(self, game):
+        self.board.draw(game.snake, game.direction, game.food, self.time,
+                        [f"Score: {game.score}"])
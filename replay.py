@@ -0,0 +1,286 @@
+import json
+import os
+import numpy as np
+import torch
+
+# Replay memory for Agent. Transitions live in preallocated, contiguous
+# arrays used as a ring buffer, so append is O(1) with no per-transition
+# Python objects, and a sampled batch is a handful of fancy-indexing copies
+# handed to torch without any further conversion.
+# The state features are all 0/1, so each state is packed into the bits of
+# a single uint16 (2 bytes instead of one byte per feature) and only
+# unpacked, in bulk, for the sampled rows.
+# With a path the arrays are .npy files in that directory opened with
+# numpy.memmap instead, so the buffer can be far larger than RAM, survives
+# across runs (pos and size are kept in meta.json, written by flush()) and
+# can be opened read-only by other processes. Sampling only touches the
+# pages of the rows it draws.
+
+_FIELDS = ('states', 'next_states', 'actions', 'rewards', 'dones')
+
+
+class ReplayBuffer:
+
+    def __init__(self, capacity, state_size=11, n_actions=3, seed=None, path=None, readonly=False):
+        if state_size > 16:
+            raise ValueError(f'cannot pack {state_size} state features into 16 bits')
+        self.capacity = capacity
+        self.state_size = state_size
+        self.n_actions = n_actions
+        self.bits = (1 << np.arange(state_size)).astype(np.uint16)
+        self.pos = 0  # next slot to write
+        self.size = 0
+        self.rng = np.random.default_rng(seed)
+        self.path = path
+        self.readonly = readonly
+
+        shapes = {
+            'states': ((capacity,), np.uint16),  # packed
+            'next_states': ((capacity,), np.uint16),
+            'actions': ((capacity, n_actions), np.int8),  # one-hot
+            'rewards': ((capacity,), np.float32),
+            'dones': ((capacity,), bool),
+        }
+        if path is None:
+            for name, (shape, dtype) in shapes.items():
+                setattr(self, name, np.zeros(shape, dtype=dtype))
+        else:
+            self._open(shapes)
+
+    def _open(self, shapes):
+        meta_path = os.path.join(self.path, 'meta.json')
+        exists = os.path.exists(meta_path)
+        if exists:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            layout = (meta['capacity'], meta['state_size'], meta['n_actions'])
+            if layout != (self.capacity, self.state_size, self.n_actions):
+                raise ValueError(f'{self.path} holds a buffer of (capacity, state_size, '
+                                 f'n_actions) {layout}, not {(self.capacity, self.state_size, self.n_actions)}')
+            self.pos, self.size = meta['pos'], meta['size']
+        elif self.readonly:
+            raise FileNotFoundError(f'no replay buffer in {self.path}')
+        else:
+            os.makedirs(self.path, exist_ok=True)
+
+        for name, (shape, dtype) in shapes.items():
+            file = os.path.join(self.path, name + '.npy')
+            if exists:
+                array = np.load(file, mmap_mode='r' if self.readonly else 'r+')
+            else:
+                array = np.lib.format.open_memmap(file, mode='w+', dtype=dtype, shape=shape)
+            setattr(self, name, array)
+        if not exists:
+            self.flush()
+
+    def flush(self):
+        # push memory-mapped data to disk and record pos/size (no-op in RAM)
+        if self.path is None or self.readonly:
+            return
+        for name in _FIELDS:
+            getattr(self, name).flush()
+        meta = {'capacity': self.capacity, 'state_size': self.state_size,
+                'n_actions': self.n_actions, 'pos': self.pos, 'size': self.size}
+        tmp = os.path.join(self.path, 'meta.json.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp, os.path.join(self.path, 'meta.json'))
+
+    def refresh(self):
+        # read-only views: pick up transitions flushed by the writer since
+        with open(os.path.join(self.path, 'meta.json')) as f:
+            meta = json.load(f)
+        self.pos, self.size = meta['pos'], meta['size']
+
+    def __len__(self):
+        return self.size
+
+    def append(self, state, action, reward, next_state, done):
+        # overwrites the oldest transition once the buffer is full
+        i = self.pos
+        self.states[i] = self.pack(state)
+        self.actions[i] = action
+        self.rewards[i] = reward
+        self.next_states[i] = self.pack(next_state)
+        self.dones[i] = done
+        self.pos = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def extend(self, states, actions, rewards, next_states, dones):
+        # append a batch of transitions (arrays with one row per transition)
+        n = len(rewards)
+        if n > self.capacity:
+            # only the newest capacity transitions would survive anyway
+            states, actions, rewards, next_states, dones = (
+                a[-self.capacity:] for a in (states, actions, rewards, next_states, dones))
+            n = self.capacity
+        idx = (self.pos + np.arange(n)) % self.capacity
+        self.states[idx] = self.pack(states)
+        self.actions[idx] = actions
+        self.rewards[idx] = rewards
+        self.next_states[idx] = self.pack(next_states)
+        self.dones[idx] = dones
+        self.pos = (self.pos + n) % self.capacity
+        self.size = min(self.size + n, self.capacity)
+        return idx
+
+    def state_dict(self):
+        # copies of the filled part of the buffer, for checkpoints
+        n = self.size
+        return {'states': self.states[:n].copy(), 'actions': self.actions[:n].copy(),
+                'rewards': self.rewards[:n].copy(), 'next_states': self.next_states[:n].copy(),
+                'dones': self.dones[:n].copy(), 'pos': self.pos, 'rng': self.rng.bit_generator.state}
+
+    def load_state_dict(self, state):
+        n = len(state['rewards'])
+        if n > self.capacity:
+            raise ValueError(f'cannot load {n} transitions into a buffer of {self.capacity}')
+        for name in _FIELDS:
+            getattr(self, name)[:n] = state[name]
+        self.size = n
+        self.pos = state['pos'] % self.capacity
+        self.rng.bit_generator.state = state['rng']
+
+    def pack(self, states):
+        # (..., state_size) 0/1 features -> (...) uint16
+        return (np.asarray(states, dtype=np.uint16) * self.bits).sum(axis=-1, dtype=np.uint16)
+
+    def unpack(self, packed):
+        # (...) uint16 -> (..., state_size) uint8 features
+        return ((packed[..., None] & self.bits) != 0).view(np.uint8)
+
+    def sample_indices(self, batch_size):
+        # distinct indices, or the whole buffer if it holds no more than batch_size
+        if self.size <= batch_size:
+            return np.arange(self.size)
+        return self.rng.choice(self.size, batch_size, replace=False)
+
+    def get(self, idx):
+        # (states, actions, rewards, next_states, dones) tensors for the given indices
+        return (torch.from_numpy(self.unpack(self.states[idx])),
+                torch.from_numpy(self.actions[idx]),
+                torch.from_numpy(self.rewards[idx]),
+                torch.from_numpy(self.unpack(self.next_states[idx])),
+                torch.from_numpy(self.dones[idx]))
+
+    def sample(self, batch_size):
+        return self.get(self.sample_indices(batch_size))
+
+
+class SumTree:
+    # Binary tree over capacity leaf priorities stored in one flat array:
+    # leaves sit at [n_leaves, 2 * n_leaves) and node i holds the sum of
+    # nodes 2i and 2i + 1, so tree[1] is the total. n_leaves is capacity
+    # rounded up to a power of two so every leaf has the same depth. Updates
+    # and proportional lookups walk one root-to-leaf path, O(log n), and both
+    # are vectorized over a whole batch of leaves.
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.n_leaves = 1 << max(capacity - 1, 0).bit_length()
+        self.tree = np.zeros(2 * self.n_leaves, dtype=np.float64)
+
+    def total(self):
+        return self.tree[1]
+
+    def update(self, idx, priorities):
+        node = np.asarray(idx, dtype=np.int64) + self.n_leaves
+        if not len(node):
+            return
+        self.tree[node] = priorities
+        # one level per iteration, every path moves up in lockstep
+        while node[0] > 1:
+            node = np.unique(node // 2)
+            self.tree[node] = self.tree[2 * node] + self.tree[2 * node + 1]
+
+    def update_one(self, i, priority):
+        # update for a single leaf: the batched path costs a np.unique and
+        # fancy indexing per level, this is a plain walk up to the root
+        tree = self.tree
+        node = i + self.n_leaves
+        tree[node] = priority
+        node //= 2
+        while node:
+            tree[node] = tree[2 * node] + tree[2 * node + 1]
+            node //= 2
+
+    def priority(self, idx):
+        return self.tree[np.asarray(idx, dtype=np.int64) + self.n_leaves]
+
+    def find(self, values):
+        # leaf index whose cumulative priority range contains each value
+        values = np.array(values, dtype=np.float64)
+        node = np.ones(len(values), dtype=np.int64)
+        while node[0] < self.n_leaves:
+            left = 2 * node
+            go_right = values > self.tree[left]
+            values -= self.tree[left] * go_right
+            node = left + go_right
+        return node - self.n_leaves
+
+
+class PrioritizedReplayBuffer(ReplayBuffer):
+    # Proportional prioritized replay (Schaul et al. 2016). A transition is
+    # drawn with probability p_i^alpha / sum_k p_k^alpha, where p_i is its
+    # last TD error; new transitions get the highest priority seen so far so
+    # they are replayed at least once. Importance-sampling weights correct
+    # the bias, with beta annealed linearly up to 1 over beta_steps calls to
+    # sample_prioritized, i.e. train_long_memory calls: one per game in
+    # agent.train, one per received chunk in parallel training.
+
+    def __init__(self, capacity, state_size=11, n_actions=3, seed=None, path=None, readonly=False,
+                 alpha=0.6, beta=0.4, beta_steps=1_000, eps=1e-3):
+        super().__init__(capacity, state_size, n_actions, seed, path, readonly)
+        self.tree = SumTree(capacity)
+        self.alpha = alpha
+        self.beta = beta
+        self.beta_increment = (1.0 - beta) / beta_steps
+        self.eps = eps
+        self.max_priority = 1.0
+        # priorities are not stored on disk: transitions reopened from a
+        # path all start at the max priority
+        self.tree.update(np.arange(self.size), self.max_priority)
+
+    def append(self, state, action, reward, next_state, done):
+        i = self.pos
+        super().append(state, action, reward, next_state, done)
+        self.tree.update_one(i, self.max_priority)
+
+    def extend(self, states, actions, rewards, next_states, dones):
+        idx = super().extend(states, actions, rewards, next_states, dones)
+        self.tree.update(idx, self.max_priority)
+        return idx
+
+    def state_dict(self):
+        state = super().state_dict()
+        state.update(priorities=self.tree.priority(range(self.size)),
+                     max_priority=self.max_priority, beta=self.beta)
+        return state
+
+    def load_state_dict(self, state):
+        super().load_state_dict(state)
+        self.tree = SumTree(self.capacity)
+        self.tree.update(range(self.size), state['priorities'])
+        self.max_priority = state['max_priority']
+        self.beta = state['beta']
+
+    def sample_prioritized(self, batch_size):
+        # returns (batch, indices, weights); batch is what sample() returns
+        # and weights is a float32 tensor of importance-sampling weights
+        n = min(batch_size, self.size)
+        total = self.tree.total()
+        # one uniform draw inside each of n equal slices of the total priority
+        bounds = np.arange(n) * (total / n)
+        values = bounds + self.rng.random(n) * (total / n)
+        idx = np.minimum(self.tree.find(values), self.size - 1)
+
+        probs = self.tree.priority(idx) / total
+        weights = (self.size * probs) ** -self.beta
+        weights /= weights.max()
+        self.beta = min(1.0, self.beta + self.beta_increment)
+        return self.get(idx), idx, torch.from_numpy(weights.astype(np.float32))
+
+    def update_priorities(self, idx, td_errors):
+        priorities = (np.abs(td_errors) + self.eps) ** self.alpha
+        self.tree.update(idx, priorities)
+        self.max_priority = max(self.max_priority, priorities.max())
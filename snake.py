@@ -1,21 +1,25 @@
 import pygame
-import random
 import time
-import math
 from enum import Enum
-from collections import namedtuple
+from collections import namedtuple, deque
+from engine import Board
+from render import BoardRenderer, TextOverlay, draw_food, draw_snake, get_font, render_text
 
-# Inicialización de pygame y configuración de fuente
-pygame.init()
-font = pygame.font.Font('arial.ttf', 25)
-title_font = pygame.font.Font('arial.ttf', 40)
+# Tamaños de fuente; las fuentes se cargan al crear la ventana, no al importar
+FONT_SIZE = 25
+TITLE_FONT_SIZE = 40
 
 # Configuración global del juego
 BLOCK_SIZE = 20
-SPEED_OPTIONS = [10, 15, 20, 25, 30]  # Opciones de velocidad (dificultad)
-SPEED = SPEED_OPTIONS[2]  # Velocidad por defecto (nivel medio)
+SPEED_OPTIONS = [10, 15, 20, 25, 30]  # Pasos de la serpiente por segundo (dificultad)
+FRAME_RATE = 60  # Frames por segundo: dibujo y lectura de entrada
+MENU_FRAME_RATE = 30  # Límite de frames en los menús
+IDLE_WAIT_MS = 500  # Espera máxima por un evento con un menú sin cambios
+MAX_FRAME_TIME = 0.25  # Tiempo máximo que avanza un frame (tras una pausa)
+ANIMATION_SPEED = 2.0  # Unidades de self.time por segundo (pulso de la comida)
 TIMER_SECONDS = 3
 MAX_ATTEMPTS = 6  # Máximo número de intentos
+MAX_QUEUED_TURNS = 3  # Giros pendientes como máximo en la cola de entrada
 
 # Definición de direcciones como enum para mejor legibilidad
 class Direction(Enum):
@@ -62,28 +66,45 @@ class Button:
     """
     Clase para crear botones interactivos con efectos de hover.
     Proporciona métodos para dibujar, detectar hover y clicks.
+    Las superficies normal y hover se pre-renderizan y se regeneran solo
+    si cambian el texto, el color o el tamaño.
     """
     def __init__(self, x, y, width, height, text, color):
         """Inicializa un botón con posición, tamaño, texto y color."""
         self.rect = pygame.Rect(x, y, width, height)
         self.text = text
         self.color = color
-        # Color más claro para el efecto hover
-        self.hover_color = (min(color[0] + 50, 255), min(color[1] + 50, 255), min(color[2] + 50, 255))
         self.is_hovered = False
+        self._key = None
+        
+    def _render(self):
+        """
+        Pre-renderiza el botón en sus dos estados (normal y hover).
+        """
+        # Color más claro para el efecto hover
+        self.hover_color = (min(self.color[0] + 50, 255), min(self.color[1] + 50, 255), min(self.color[2] + 50, 255))
+        
+        text_surface = render_text(get_font(FONT_SIZE), self.text, WHITE)
+        self._surfaces = []
+        for color in (self.color, self.hover_color):
+            surface = pygame.Surface(self.rect.size, pygame.SRCALPHA)
+            rect = surface.get_rect()
+            pygame.draw.rect(surface, color, rect, border_radius=10)
+            pygame.draw.rect(surface, WHITE, rect, 2, border_radius=10)  # Borde blanco
+            surface.blit(text_surface, text_surface.get_rect(center=rect.center))
+            if pygame.display.get_surface() is not None:
+                surface = surface.convert_alpha()  # Formato de la pantalla: blit más rápido
+            self._surfaces.append(surface)
+        self._key = (self.text, self.color, self.rect.size)
         
     def draw(self, surface):
         """
         Dibuja el botón en la superficie especificada, 
         con efecto de hover si el ratón está encima.
         """
-        color = self.hover_color if self.is_hovered else self.color
-        pygame.draw.rect(surface, color, self.rect, border_radius=10)
-        pygame.draw.rect(surface, WHITE, self.rect, 2, border_radius=10)  # Borde blanco
-        
-        text_surface = font.render(self.text, True, WHITE)
-        text_rect = text_surface.get_rect(center=self.rect.center)
-        surface.blit(text_surface, text_rect)
+        if self._key != (self.text, self.color, self.rect.size):
+            self._render()
+        surface.blit(self._surfaces[self.is_hovered], self.rect)
         
     def check_hover(self, pos):
         """
@@ -120,6 +141,8 @@ class SnakeGame:
         self.display = pygame.display.set_mode((self.w, self.h))
         pygame.display.set_caption('Snake')
         self.clock = pygame.time.Clock()
+        self.font = get_font(FONT_SIZE)
+        self.title_font = get_font(TITLE_FONT_SIZE)
         
         # Estado del juego y número de intentos
         self.game_state = GameState.MENU
@@ -134,6 +157,23 @@ class SnakeGame:
         # Variable para los efectos de animación
         self.time = 0
         
+        # Los menús solo se redibujan cuando cambia lo que muestran
+        self.screen_key = None
+        self.screen_dirty = True
+        self.idle = False
+        
+        # Latencia de cada giro (tecla -> paso que lo aplica) en esta sesión
+        self.input_latencies = []
+        self.dropped_turns = 0
+        
+        # Renderizador incremental de la pantalla de juego (puntuación a la
+        # izquierda, intentos restantes a la derecha)
+        colors = SNAKE_COLORS[self.selected_color_index]
+        self.renderer = BoardRenderer(self.display, self.background, colors["primary"], colors["secondary"], texts=[
+            TextOverlay(self.font, (0, 0)),
+            TextOverlay(self.font, (self.w - 10, 0), anchor='topright'),
+        ])
+        
         # Inicializar el juego y crear botones
         self.reset_game()
         self.create_buttons()
@@ -197,9 +237,14 @@ class SnakeGame:
         
         # Crear la serpiente inicial (cabeza + 2 segmentos)
         self.head = Point(self.w/2, self.h/2)
-        self.snake = [self.head, 
-                      Point(self.head.x-BLOCK_SIZE, self.head.y),
-                      Point(self.head.x-(2*BLOCK_SIZE), self.head.y)]
+        self.snake = deque([self.head, 
+                            Point(self.head.x-BLOCK_SIZE, self.head.y),
+                            Point(self.head.x-(2*BLOCK_SIZE), self.head.y)])
+        
+        # Rejilla de ocupación: consultas de colisión en tiempo constante
+        self.board = Board(self.w, self.h, BLOCK_SIZE)
+        for pt in self.snake:
+            self.board.occupy(pt)
         
         # Reiniciar puntuación y comida
         self.score = 0
@@ -211,43 +256,51 @@ class SnakeGame:
         self.start_time = time.time()
         self.time = 0
         
-        # Buffer para teclas presionadas
-        self.key_buffer = []
+        # Cola de giros pendientes: (dirección, instante de la tecla)
+        self.turn_queue = deque()
         
-        # Resetear game_over
+        # Resetear game_over y victoria
         self.game_over = False
+        self.won = False
         
-        # Asegurar que se usa la velocidad seleccionada
-        global SPEED
-        SPEED = SPEED_OPTIONS[self.selected_speed_index]
+        # Tiempo acumulado aún no consumido por pasos de la lógica
+        self.accumulator = 0.0
     
     def generate_food(self):
         """
-        Genera una nueva pieza de comida en una posición aleatoria.
-        Evita que la comida aparezca donde está la serpiente.
+        Genera una nueva pieza de comida en una celda libre elegida al azar.
+        El sorteo usa el índice de celdas libres del tablero, así que cuesta
+        lo mismo sea cual sea la longitud de la serpiente.
+        
+        Returns:
+            bool: True si se colocó la comida, False si el tablero está lleno
         """
-        x = random.randint(0, (self.w-BLOCK_SIZE) // BLOCK_SIZE) * BLOCK_SIZE 
-        y = random.randint(0, (self.h-BLOCK_SIZE) // BLOCK_SIZE) * BLOCK_SIZE
-        self.food = Point(x, y)
-        if self.food in self.snake:
-            self.generate_food()  # Recursión si la comida apareció en la serpiente
+        food = self.board.random_free()
+        if food is None:
+            return False
+        self.food = food
+        return True
     
-    def is_valid_direction(self, new_direction):
+    def is_valid_direction(self, new_direction, after=None):
         """
         Verifica si la dirección solicitada es válida 
         (evita que la serpiente pueda girar 180 grados sobre sí misma).
         
         Args:
             new_direction (Direction): La nueva dirección propuesta
+            after (Direction): Dirección tras la que se aplicará
+                (por defecto, la del último movimiento)
             
         Returns:
             bool: True si la dirección es válida, False si no lo es
         """
-        # Verificar que la nueva dirección no sea opuesta a la dirección actual
-        if (new_direction == Direction.LEFT and self.last_direction == Direction.RIGHT) or \
-           (new_direction == Direction.RIGHT and self.last_direction == Direction.LEFT) or \
-           (new_direction == Direction.UP and self.last_direction == Direction.DOWN) or \
-           (new_direction == Direction.DOWN and self.last_direction == Direction.UP):
+        if after is None:
+            after = self.last_direction
+        # Verificar que la nueva dirección no sea opuesta a la anterior
+        if (new_direction == Direction.LEFT and after == Direction.RIGHT) or \
+           (new_direction == Direction.RIGHT and after == Direction.LEFT) or \
+           (new_direction == Direction.UP and after == Direction.DOWN) or \
+           (new_direction == Direction.DOWN and after == Direction.UP):
             return False
         return True
     
@@ -259,28 +312,32 @@ class SnakeGame:
         Returns:
             tuple: (cerrar_juego, click_del_raton)
         """
-        self.key_buffer = []  # Reiniciar el buffer en cada frame
         mouse_click = False
         
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 return True, False
             
+            # La ventana se ha vuelto a mostrar: redibujar toda la pantalla
+            if event.type == pygame.WINDOWEXPOSED:
+                self.renderer.invalidate()
+                self.screen_dirty = True
+            
             # Procesar entradas de teclado durante el juego
             if self.game_state == GameState.PLAYING:
                 if event.type == pygame.KEYDOWN:
                     if not self.game_started or self.game_over:
                         continue  # Ignorar entradas de dirección durante el temporizador o game over
                     
-                    # Almacenar la tecla en el buffer
+                    # Encolar el giro con el instante en que se leyó la tecla
                     if event.key == pygame.K_LEFT or event.key == pygame.K_a:
-                        self.key_buffer.append(Direction.LEFT)
+                        self.queue_turn(Direction.LEFT)
                     elif event.key == pygame.K_RIGHT or event.key == pygame.K_d:
-                        self.key_buffer.append(Direction.RIGHT)
+                        self.queue_turn(Direction.RIGHT)
                     elif event.key == pygame.K_UP or event.key == pygame.K_w:
-                        self.key_buffer.append(Direction.UP)
+                        self.queue_turn(Direction.UP)
                     elif event.key == pygame.K_DOWN or event.key == pygame.K_s:
-                        self.key_buffer.append(Direction.DOWN)
+                        self.queue_turn(Direction.DOWN)
                     # Tecla ESC para volver al menú principal
                     elif event.key == pygame.K_ESCAPE:
                         self.game_state = GameState.MENU
@@ -291,55 +348,109 @@ class SnakeGame:
                 
         return False, mouse_click
     
+    def queue_turn(self, direction):
+        """
+        Añade un giro a la cola de entrada. Cada giro se valida contra la
+        dirección tras la que se aplicará (el último giro pendiente o la
+        dirección actual), así que varios giros rápidos dentro de un mismo
+        paso (p. ej. ARRIBA y luego IZQUIERDA) se aplican en pasos sucesivos.
+        
+        Args:
+            direction (Direction): La dirección pulsada
+        """
+        after = self.turn_queue[-1][0] if self.turn_queue else self.direction
+        if direction == after or not self.is_valid_direction(direction, after):
+            return  # No cambia nada o sería un giro de 180 grados
+        if len(self.turn_queue) >= MAX_QUEUED_TURNS:
+            self.dropped_turns += 1
+            return
+        self.turn_queue.append((direction, time.perf_counter()))
+    
     def process_direction_input(self):
         """
-        Procesa el buffer de teclas y establece la dirección actual
-        basándose en la última tecla válida presionada.
+        Aplica el siguiente giro pendiente, uno por paso de la lógica, y
+        registra cuánto tardó desde que se pulsó la tecla.
+        """
+        if self.turn_queue:
+            self.direction, pressed = self.turn_queue.popleft()
+            self.input_latencies.append(time.perf_counter() - pressed)
+    
+    def input_latency_report(self):
+        """
+        Resume la latencia entre tecla y movimiento de esta sesión.
+        
+        Returns:
+            dict: número de giros, media, p50, p95 y máximo en ms, y giros descartados
+        """
+        lat = sorted(self.input_latencies)
+        if not lat:
+            return {"turns": 0, "dropped": self.dropped_turns}
+        ms = lambda q: lat[min(len(lat) - 1, int(q * len(lat)))] * 1000
+        return {
+            "turns": len(lat),
+            "mean_ms": sum(lat) / len(lat) * 1000,
+            "p50_ms": ms(0.5),
+            "p95_ms": ms(0.95),
+            "max_ms": lat[-1] * 1000,
+            "dropped": self.dropped_turns,
+        }
+    
+    def screen_changed(self, *key):
         """
-        if self.key_buffer:
-            # Tomar la última tecla presionada que sea válida
-            for direction in reversed(self.key_buffer):
-                if self.is_valid_direction(direction):
-                    self.direction = direction
-                    break
+        Indica si una pantalla de menú debe redibujarse: la ventana se ha
+        invalidado o ha cambiado lo que muestra (estado, hover, selección...).
+        Si no, el frame queda ocioso y el siguiente espera a un evento.
+        
+        Args:
+            key: Todo lo que determina el contenido de la pantalla
+            
+        Returns:
+            bool: True si hay que dibujar la pantalla
+        """
+        key = (self.game_state,) + key
+        changed = self.screen_dirty or key != self.screen_key
+        self.screen_key = key
+        self.screen_dirty = False
+        self.idle = not changed
+        return changed
     
     def render_menu(self, mouse_pos, mouse_click):
         """
         Renderiza la pantalla del menú principal con todos los botones
-        y maneja las interacciones.
+        y maneja las interacciones. Solo se redibuja si algo ha cambiado.
         
         Args:
             mouse_pos (tuple): Posición actual del ratón
             mouse_click (bool): Si se ha hecho click en este frame
         """
-        # Dibujar el fondo con cuadrícula
-        self.display.blit(self.background, (0, 0))
-        
-        # Mostrar título del juego
-        title_text = title_font.render("SNAKE GAME", True, WHITE)
-        title_shadow = title_font.render("SNAKE GAME", True, (50, 50, 50))
-        title_rect = title_text.get_rect(center=(self.w // 2, 60))
-        shadow_rect = title_text.get_rect(center=(self.w // 2 + 2, 62))
-        
-        self.display.blit(title_shadow, shadow_rect)
-        self.display.blit(title_text, title_rect)
-        
-        # Mostrar información de intentos restantes
-        attempts_text = font.render(f"Intentos restantes: {self.attempts_remaining}", True, WHITE)
-        attempts_rect = attempts_text.get_rect(center=(self.w // 2, 100))
-        self.display.blit(attempts_text, attempts_rect)
-        
         # Verificar interacciones con botones
-        self.play_button.check_hover(mouse_pos)
-        self.difficulty_button.check_hover(mouse_pos)
-        self.color_button.check_hover(mouse_pos)
-        self.quit_button.check_hover(mouse_pos)
+        buttons = (self.play_button, self.difficulty_button, self.color_button, self.quit_button)
+        for button in buttons:
+            button.check_hover(mouse_pos)
         
-        # Dibujar botones
-        self.play_button.draw(self.display)
-        self.difficulty_button.draw(self.display)
-        self.color_button.draw(self.display)
-        self.quit_button.draw(self.display)
+        if self.screen_changed(self.attempts_remaining, *(button.is_hovered for button in buttons)):
+            # Dibujar el fondo con cuadrícula
+            self.display.blit(self.background, (0, 0))
+            
+            # Mostrar título del juego
+            title_text = self.title_font.render("SNAKE GAME", True, WHITE)
+            title_shadow = self.title_font.render("SNAKE GAME", True, (50, 50, 50))
+            title_rect = title_text.get_rect(center=(self.w // 2, 60))
+            shadow_rect = title_text.get_rect(center=(self.w // 2 + 2, 62))
+            
+            self.display.blit(title_shadow, shadow_rect)
+            self.display.blit(title_text, title_rect)
+            
+            # Mostrar información de intentos restantes
+            attempts_text = self.font.render(f"Intentos restantes: {self.attempts_remaining}", True, WHITE)
+            attempts_rect = attempts_text.get_rect(center=(self.w // 2, 100))
+            self.display.blit(attempts_text, attempts_rect)
+            
+            # Dibujar botones
+            for button in buttons:
+                button.draw(self.display)
+            
+            pygame.display.flip()
         
         # Procesar clicks
         if mouse_click:
@@ -357,84 +468,91 @@ class SnakeGame:
             elif self.quit_button.is_clicked(mouse_pos, True):
                 return True  # Señal para salir del juego
         
-        pygame.display.flip()
         return False
     
     def render_difficulty_screen(self, mouse_pos, mouse_click):
         """
         Renderiza la pantalla de selección de dificultad y maneja
-        las interacciones con los botones.
+        las interacciones con los botones. Solo se redibuja si algo ha cambiado.
         
         Args:
             mouse_pos (tuple): Posición actual del ratón
             mouse_click (bool): Si se ha hecho click en este frame
         """
-        # Dibujar el fondo con cuadrícula
-        self.display.blit(self.background, (0, 0))
+        # Verificar interacciones con botones
+        buttons = self.difficulty_buttons + [self.back_button]
+        for button in buttons:
+            button.check_hover(mouse_pos)
         
-        # Mostrar título
-        title_text = title_font.render("DIFICULTAD", True, WHITE)
-        title_rect = title_text.get_rect(center=(self.w // 2, 60))
-        self.display.blit(title_text, title_rect)
+        if self.screen_changed(*(button.is_hovered for button in buttons)):
+            # Dibujar el fondo con cuadrícula
+            self.display.blit(self.background, (0, 0))
+            
+            # Mostrar título
+            title_text = self.title_font.render("DIFICULTAD", True, WHITE)
+            title_rect = title_text.get_rect(center=(self.w // 2, 60))
+            self.display.blit(title_text, title_rect)
+            
+            # Dibujar botones de dificultad y de volver
+            for button in buttons:
+                button.draw(self.display)
+            
+            pygame.display.flip()
         
-        # Verificar interacciones con botones de dificultad
+        # Procesar clicks
         for i, button in enumerate(self.difficulty_buttons):
-            button.check_hover(mouse_pos)
-            button.draw(self.display)
             if mouse_click and button.is_clicked(mouse_pos, True):
                 self.selected_speed_index = i  # Actualiza el índice de velocidad seleccionada
-                global SPEED
-                SPEED = SPEED_OPTIONS[self.selected_speed_index]  # Actualiza la velocidad global
                 self.game_state = GameState.MENU  # Regresa al menú principal
         
-        # Dibujar botón de volver
-        self.back_button.check_hover(mouse_pos)
-        self.back_button.draw(self.display)
         if mouse_click and self.back_button.is_clicked(mouse_pos, True):
             self.game_state = GameState.MENU  # Regresa al menú principal
-        
-        pygame.display.flip()
     
     def render_color_select_screen(self, mouse_pos, mouse_click):
         """
         Renderiza la pantalla de selección de color para la serpiente
-        y maneja las interacciones con los botones.
+        y maneja las interacciones con los botones. Solo se redibuja si
+        algo ha cambiado.
         
         Args:
             mouse_pos (tuple): Posición actual del ratón
             mouse_click (bool): Si se ha hecho click en este frame
         """
-        # Dibujar el fondo con cuadrícula
-        self.display.blit(self.background, (0, 0))
-        
-        # Mostrar título
-        title_text = title_font.render("COLOR DE SERPIENTE", True, WHITE)
-        title_rect = title_text.get_rect(center=(self.w // 2, 60))
-        self.display.blit(title_text, title_rect)
-        
-        # Verificar interacciones con botones de color
+        # Procesar clicks en los botones de color
         for i, button in enumerate(self.color_buttons):
-            button.check_hover(mouse_pos)
-            button.draw(self.display)
-            
-            # Marcar el color seleccionado
-            if i == self.selected_color_index:
-                pygame.draw.rect(self.display, WHITE, button.rect, 3, border_radius=10)
-                
             if mouse_click and button.is_clicked(mouse_pos, True):
                 self.selected_color_index = i
         
-        # Verificar interacción con botón de volver
-        self.back_button.check_hover(mouse_pos)
-        self.back_button.draw(self.display)
+        # Verificar interacciones con botones
+        buttons = self.color_buttons + [self.back_button]
+        for button in buttons:
+            button.check_hover(mouse_pos)
         
-        if mouse_click and self.back_button.is_clicked(mouse_pos, True):
-            self.game_state = GameState.MENU
+        if self.screen_changed(self.selected_color_index, *(button.is_hovered for button in buttons)):
+            # Dibujar el fondo con cuadrícula
+            self.display.blit(self.background, (0, 0))
+            
+            # Mostrar título
+            title_text = self.title_font.render("COLOR DE SERPIENTE", True, WHITE)
+            title_rect = title_text.get_rect(center=(self.w // 2, 60))
+            self.display.blit(title_text, title_rect)
             
-        # Dibujar una vista previa de la serpiente con el color seleccionado
-        self.render_snake_preview()
+            # Dibujar botones de color y marcar el color seleccionado
+            for i, button in enumerate(self.color_buttons):
+                button.draw(self.display)
+                if i == self.selected_color_index:
+                    pygame.draw.rect(self.display, WHITE, button.rect, 3, border_radius=10)
+            
+            # Dibujar botón de volver
+            self.back_button.draw(self.display)
+            
+            # Dibujar una vista previa de la serpiente con el color seleccionado
+            self.render_snake_preview()
+            
+            pygame.display.flip()
         
-        pygame.display.flip()
+        if mouse_click and self.back_button.is_clicked(mouse_pos, True):
+            self.game_state = GameState.MENU
     
     def render_snake_preview(self):
         """
@@ -450,7 +568,7 @@ class SnakeGame:
         color_secondary = SNAKE_COLORS[self.selected_color_index]["secondary"]
         
         # Dibujar texto de vista previa
-        preview_text = font.render("Vista previa:", True, WHITE)
+        preview_text = self.font.render("Vista previa:", True, WHITE)
         preview_rect = preview_text.get_rect(center=(preview_x, preview_y - 40))
         self.display.blit(preview_text, preview_rect)
         
@@ -502,7 +620,6 @@ class SnakeGame:
             
             # Actualizar UI para el temporizador
             self.render_timer_screen(TIMER_SECONDS - int(elapsed_time))
-            self.clock.tick(60)  # FPS durante el temporizador
             return True
             
         return False
@@ -520,7 +637,9 @@ class SnakeGame:
         # Mover la cabeza de la serpiente
         self.move_snake(self.direction)
         self.last_direction = self.direction  # Actualizar la última dirección
-        self.snake.insert(0, self.head)
+        self.snake.appendleft(self.head)
+        if self.board.contains(self.head):
+            self.board.occupy(self.head)
         
         # Verificar colisiones
         if self.check_collision():
@@ -533,9 +652,15 @@ class SnakeGame:
         # Verificar si se comió la comida
         if self.head == self.food:
             self.score += 1
-            self.generate_food()
+            if not self.generate_food():
+                # La serpiente ocupa todo el tablero: victoria (no gasta intento)
+                self.won = True
+                self.game_over = True
+                self.game_state = GameState.GAME_OVER
+                self.render_game_over_screen()
+                return True
         else:
-            self.snake.pop()  # Solo eliminar la cola si no comió
+            self.board.release(self.snake.pop())  # Solo eliminar la cola si no comió
         
         return False
         
@@ -550,8 +675,8 @@ class SnakeGame:
         # Colisión con los bordes
         if self.head.x > self.w - BLOCK_SIZE or self.head.x < 0 or self.head.y > self.h - BLOCK_SIZE or self.head.y < 0:
             return True
-        # Colisión con la propia serpiente
-        if self.head in self.snake[1:]:
+        # Colisión con la propia serpiente (la celda de la cabeza cuenta una vez)
+        if self.board.count(self.head) > 1:
             return True
         
         return False
@@ -618,8 +743,9 @@ class SnakeGame:
         self.display.blit(self.background, (0, 0))
         
         # Mostrar mensaje de fin de juego con efecto de sombra
+        message = "¡Has ganado!" if self.won else "¡Juego terminado!"
         self.render_text_with_shadow(
-            f"¡Juego terminado! Puntuación: {self.score}", 
+            f"{message} Puntuación: {self.score}", 
             position=(self.w/2, self.h/2 - 60),
             is_centered=True
         )
@@ -653,8 +779,9 @@ class SnakeGame:
         self.restart_button.check_hover(mouse_pos)
         self.menu_button.check_hover(mouse_pos)
         
-        # Dibujar la pantalla de game over
-        self.render_game_over_screen()
+        # Dibujar la pantalla de game over si ha cambiado
+        if self.screen_changed(self.restart_button.is_hovered, self.menu_button.is_hovered):
+            self.render_game_over_screen()
         
         # Procesar clicks
         if mouse_click:
@@ -668,134 +795,37 @@ class SnakeGame:
                 
         return True
         
-    def render_game_screen(self):
+    def render_game_screen(self, alpha=1.0):
         """
         Renderiza la pantalla principal del juego con la serpiente,
         comida y puntuación.
-        """
-        # Dibujar el fondo con cuadrícula
-        self.display.blit(self.background, (0, 0))
-        
-        # Dibujar la serpiente con gradiente y ojos
-        self.render_snake_with_gradient_and_eyes()
-        
-        # Dibujar la comida con efectos
-        self.render_food_with_effects()
         
-        # Mostrar puntuación con efecto de sombra
-        self.render_text_with_shadow(
-            f"Score: {self.score}", 
-            position=(0, 0),
-            is_centered=False
-        )
-        
-        # Mostrar intentos restantes en la esquina superior derecha
-        attempts_text = f"Intentos: {self.attempts_remaining}"
-        text_width = font.size(attempts_text)[0]
-        self.render_text_with_shadow(
-            attempts_text,
-            position=(self.w - text_width - 10, 0),
-            is_centered=False
-        )
-        
-        pygame.display.flip()
+        Args:
+            alpha (float): Fracción del paso actual ya transcurrida; la
+                cabeza y la cola se dibujan interpoladas entre celdas
+        """
+        # Solo se redibujan las celdas que cambiaron desde el último frame
+        colors = SNAKE_COLORS[self.selected_color_index]
+        self.renderer.set_palette(colors["primary"], colors["secondary"])
+        self.renderer.draw(self.snake, self.direction, self.food, self.time, [
+            f"Score: {self.score}",
+            f"Intentos: {self.attempts_remaining}",
+        ], alpha=alpha)
         
     def render_snake_with_gradient(self):
         """
         Renderiza la serpiente con un efecto de gradiente
         pero sin ojos (para la pantalla de temporizador).
         """
-        # Obtener colores seleccionados
-        color_primary = SNAKE_COLORS[self.selected_color_index]["primary"]
-        color_secondary = SNAKE_COLORS[self.selected_color_index]["secondary"]
-        
-        for i, pt in enumerate(self.snake):
-            # Calcular intensidad de color basada en la posición
-            intensity = 1 - (i / (len(self.snake) * 1.5))
-            if intensity < 0.3:
-                intensity = 0.3
-                
-            # Crear color con gradiente
-            color = (int(color_primary[0] * intensity), int(color_primary[1] * intensity), int(color_primary[2] * intensity))
-            inner_color = (int(color_secondary[0] * intensity), int(color_secondary[1] * intensity), int(color_secondary[2] * intensity))
-            
-            # Dibujar segmento con bordes redondeados
-            pygame.draw.rect(self.display, color, pygame.Rect(pt.x, pt.y, BLOCK_SIZE, BLOCK_SIZE), border_radius=3)
-            pygame.draw.rect(self.display, inner_color, pygame.Rect(pt.x+4, pt.y+4, 12, 12), border_radius=2)
-    
-    def render_snake_with_gradient_and_eyes(self):
-        """
-        Renderiza la serpiente con efecto de gradiente y ojos
-        en la cabeza que siguen la dirección del movimiento.
-        """
-        # Obtener colores seleccionados
-        color_primary = SNAKE_COLORS[self.selected_color_index]["primary"]
-        color_secondary = SNAKE_COLORS[self.selected_color_index]["secondary"]
-        
-        for i, pt in enumerate(self.snake):
-            # Calcular intensidad de color basada en la posición
-            intensity = 1 - (i / (len(self.snake) * 1.5))
-            if intensity < 0.3:
-                intensity = 0.3
-                
-            # Crear color con gradiente
-            color = (int(color_primary[0] * intensity), int(color_primary[1] * intensity), int(color_primary[2] * intensity))
-            inner_color = (int(color_secondary[0] * intensity), int(color_secondary[1] * intensity), int(color_secondary[2] * intensity))
-            
-            # Dibujar segmento con bordes redondeados
-            pygame.draw.rect(self.display, color, pygame.Rect(pt.x, pt.y, BLOCK_SIZE, BLOCK_SIZE), border_radius=3)
-            pygame.draw.rect(self.display, inner_color, pygame.Rect(pt.x+4, pt.y+4, 12, 12), border_radius=2)
-            
-            # Añadir ojos solo a la cabeza
-            if i == 0:
-                self.render_snake_eyes(pt)
-    
-    def render_snake_eyes(self, head_position):
-        """
-        Renderiza los ojos en la cabeza de la serpiente según la dirección.
-        
-        Args:
-            head_position (Point): La posición de la cabeza
-        """
-        eye_radius = 2
-        eye_offset_x = 5
-        eye_offset_y = 8
-        
-        if self.direction == Direction.RIGHT:
-            pygame.draw.circle(self.display, WHITE, (head_position.x + BLOCK_SIZE - eye_offset_x, head_position.y + eye_offset_y), eye_radius)
-            pygame.draw.circle(self.display, WHITE, (head_position.x + BLOCK_SIZE - eye_offset_x, head_position.y + BLOCK_SIZE - eye_offset_y), eye_radius)
-        elif self.direction == Direction.LEFT:
-            pygame.draw.circle(self.display, WHITE, (head_position.x + eye_offset_x, head_position.y + eye_offset_y), eye_radius)
-            pygame.draw.circle(self.display, WHITE, (head_position.x + eye_offset_x, head_position.y + BLOCK_SIZE - eye_offset_y), eye_radius)
-        elif self.direction == Direction.UP:
-            pygame.draw.circle(self.display, WHITE, (head_position.x + eye_offset_y, head_position.y + eye_offset_x), eye_radius)
-            pygame.draw.circle(self.display, WHITE, (head_position.x + BLOCK_SIZE - eye_offset_y, head_position.y + eye_offset_x), eye_radius)
-        elif self.direction == Direction.DOWN:
-            pygame.draw.circle(self.display, WHITE, (head_position.x + eye_offset_y, head_position.y + BLOCK_SIZE - eye_offset_x), eye_radius)
-            pygame.draw.circle(self.display, WHITE, (head_position.x + BLOCK_SIZE - eye_offset_y, head_position.y + BLOCK_SIZE - eye_offset_x), eye_radius)
+        colors = SNAKE_COLORS[self.selected_color_index]
+        draw_snake(self.display, self.snake, self.direction, colors["primary"], colors["secondary"], eyes=False)
     
     def render_food_with_effects(self):
         """
-        Renderiza la comida con efectos de pulsación, brillo y reflejos.
+        Renderiza la comida con efectos de pulsación, brillo y reflejos
+        (un fotograma pre-renderizado de la animación).
         """
-        # Calcular efecto de pulsación
-        pulse = (math.sin(self.time * 5) + 1) / 4 + 0.75  # Valor entre 0.75 y 1.25
-        food_color = (int(RED[0] * pulse), int(RED[1] * pulse), int(RED[2] * pulse))
-        
-        # Dibujar brillo alrededor de la comida
-        glow_radius = int(BLOCK_SIZE * (1 + 0.3 * math.sin(self.time * 3)))
-        glow_surf = pygame.Surface((glow_radius * 2, glow_radius * 2), pygame.SRCALPHA)
-        pygame.draw.circle(glow_surf, (*LIGHT_RED, 40), (glow_radius, glow_radius), glow_radius)
-        self.display.blit(glow_surf, (self.food.x + BLOCK_SIZE//2 - glow_radius, self.food.y + BLOCK_SIZE//2 - glow_radius))
-        
-        # Dibujar la comida con bordes redondeados
-        pygame.draw.rect(self.display, food_color, pygame.Rect(self.food.x, self.food.y, BLOCK_SIZE, BLOCK_SIZE), border_radius=BLOCK_SIZE//2)
-        pygame.draw.rect(self.display, LIGHT_RED, pygame.Rect(self.food.x+2, self.food.y+2, BLOCK_SIZE-4, BLOCK_SIZE-4), border_radius=BLOCK_SIZE//2-1)
-        
-        # Añadir reflejo a la comida
-        highlight_pos = (self.food.x + 5, self.food.y + 5)
-        highlight_size = 3
-        pygame.draw.circle(self.display, WHITE, highlight_pos, highlight_size)
+        draw_food(self.display, self.food, self.time)
     
     def render_text_with_shadow(self, text, position, is_centered=False):
         """
@@ -806,8 +836,8 @@ class SnakeGame:
             position (tuple): Posición (x, y) donde mostrar el texto
             is_centered (bool): Si el texto debe centrarse en la posición
         """
-        text_shadow = font.render(text, True, (30, 30, 30))
-        text_surface = font.render(text, True, WHITE)
+        text_shadow = render_text(self.font, text, (30, 30, 30))
+        text_surface = render_text(self.font, text, WHITE)
         
         if is_centered:
             shadow_rect = text_shadow.get_rect(center=(position[0] + 2, position[1] + 2))
@@ -821,14 +851,31 @@ class SnakeGame:
     
     def play_step(self):
         """
-        Ejecuta un paso del juego, gestionando entrada, lógica y renderizado.
+        Ejecuta un frame del juego, gestionando entrada, lógica y renderizado.
         Maneja los diferentes estados del juego.
         
+        La entrada y el dibujo van a FRAME_RATE; la lógica avanza en pasos
+        fijos de 1/velocidad con un acumulador, de modo que un frame lento
+        no frena a la serpiente y la dificultad no cambia la fluidez.
+        Los menús van como mucho a MENU_FRAME_RATE y, mientras nada cambia,
+        esperan bloqueados al siguiente evento.
+        
         Returns:
             bool: True para continuar ejecutando el juego, False para terminar
         """
+        if self.game_state == GameState.PLAYING:
+            dt = self.clock.tick(FRAME_RATE)
+        else:
+            # Menú sin cambios en el último frame: dormir hasta el próximo evento
+            if self.idle:
+                event = pygame.event.wait(IDLE_WAIT_MS)
+                if event.type != pygame.NOEVENT:
+                    pygame.event.post(event)
+            dt = self.clock.tick(MENU_FRAME_RATE)
+        dt = min(dt / 1000, MAX_FRAME_TIME)
+        
         # Incrementar tiempo para animaciones
-        self.time += 0.1
+        self.time += dt * ANIMATION_SPEED
         
         # Obtener entradas del usuario
         quit_game, mouse_click = self.handle_input()
@@ -837,6 +884,14 @@ class SnakeGame:
             
         mouse_pos = pygame.mouse.get_pos()
         
+        # Otra pantalla ocupa la ventana: el próximo frame de juego será completo,
+        # y lo mismo para el próximo frame de menú tras jugar
+        if self.game_state != GameState.PLAYING or not self.game_started:
+            self.renderer.invalidate()
+        if self.game_state == GameState.PLAYING:
+            self.screen_dirty = True
+            self.idle = False
+        
         # Manejar el estado actual del juego
         if self.game_state == GameState.MENU:
             quit_requested = self.render_menu(mouse_pos, mouse_click)
@@ -858,23 +913,21 @@ class SnakeGame:
                 self.game_state = GameState.MENU
                 return True
                 
-            # Procesar entradas de dirección
-            self.process_direction_input()
-            
             # Verificar temporizador inicial
             if self.check_timer():
                 return True
                 
-            # Actualizar estado del juego
-            game_ended = self.update_game_state()
-            if not game_ended:
-                # Renderizar pantalla de juego
-                self.render_game_screen()
+            # Avanzar la lógica tantos pasos fijos como quepan en el tiempo acumulado
+            step_time = 1 / SPEED_OPTIONS[self.selected_speed_index]
+            self.accumulator += dt
+            while self.accumulator >= step_time:
+                self.accumulator -= step_time
+                self.process_direction_input()  # Un giro pendiente por paso
+                if self.update_game_state():
+                    return True  # Se ha mostrado la pantalla de fin de juego
             
-            # Ajustar velocidad según la dificultad seleccionada actual
-            global SPEED
-            SPEED = SPEED_OPTIONS[self.selected_speed_index]
-            self.clock.tick(SPEED)
+            # Renderizar pantalla de juego, interpolando dentro del paso actual
+            self.render_game_screen(self.accumulator / step_time)
         
         return True
 
@@ -887,4 +940,9 @@ if __name__ == '__main__':
     while running:
         running = game.play_step()
         
+    report = game.input_latency_report()
+    if report["turns"]:
+        print(f"Latencia tecla -> movimiento: {report['turns']} giros, media {report['mean_ms']:.1f} ms, "
+              f"p50 {report['p50_ms']:.1f} ms, p95 {report['p95_ms']:.1f} ms, máx {report['max_ms']:.1f} ms, "
+              f"{report['dropped']} descartados")
     pygame.quit()
\ No newline at end of file
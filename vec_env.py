@@ -0,0 +1,131 @@
+import numpy as np
+from engine import BLOCK_SIZE
+from features import DELTAS, state_features
+
+# N snake games stepped in lockstep on NumPy arrays. Same rules, rewards and
+# 11-feature state as SnakeGameAI + Agent.get_state, but one step() call
+# advances every game at once. Positions are in grid cells, not pixels.
+
+# Direction change for [straight, right, left]
+TURNS = np.array([0, 1, -1], dtype=np.int32)
+
+DIR_RIGHT, DIR_DOWN, DIR_LEFT, DIR_UP = range(4)
+
+
+class SnakeVecEnv:
+
+    def __init__(self, n_envs, w=640, h=480, seed=None):
+        self.n_envs = n_envs
+        self.cols = w // BLOCK_SIZE
+        self.rows = h // BLOCK_SIZE
+        self.n_cells = self.cols * self.rows
+        self.rng = np.random.default_rng(seed)
+
+        n = n_envs
+        self.head = np.zeros((n, 2), dtype=np.int32)  # (col, row)
+        self.direction = np.zeros(n, dtype=np.int32)  # index into DELTAS
+        self.food = np.zeros((n, 2), dtype=np.int32)
+        self.frame_iteration = np.zeros(n, dtype=np.int32)
+        self.score = np.zeros(n, dtype=np.int32)
+        # body cells as a ring buffer per game: body[i, start[i]] is the head,
+        # the next length[i]-1 slots (mod n_cells) run down to the tail
+        self.body = np.zeros((n, self.n_cells, 2), dtype=np.int32)
+        self.start = np.zeros(n, dtype=np.int64)
+        self.length = np.zeros(n, dtype=np.int64)
+        self.occupied = np.zeros((n, self.rows, self.cols), dtype=bool)
+        self._all = np.arange(n)
+
+        self.reset()
+
+    def reset(self, mask=None):
+        # reset the games selected by the boolean mask (all of them by default)
+        # and return the states of every game
+        idx = self._all if mask is None else np.flatnonzero(mask)
+        if len(idx):
+            self.occupied[idx] = False
+            self.direction[idx] = DIR_RIGHT
+            self.frame_iteration[idx] = 0
+            self.score[idx] = 0
+            self.start[idx] = 0
+            self.length[idx] = 3
+
+            center = np.array([self.cols // 2, self.rows // 2], dtype=np.int32)
+            for k in range(3):
+                cell = center - [k, 0]
+                self.body[idx, k] = cell
+                self.occupied[idx, cell[1], cell[0]] = True
+            self.head[idx] = center
+            self._place_food(idx)
+        return self.get_states()
+
+    def _place_food(self, idx):
+        # uniform draw among the free cells of every selected game at once
+        free = ~self.occupied[idx].reshape(len(idx), -1)
+        keys = self.rng.random(free.shape)
+        keys[~free] = -1.0
+        cell = keys.argmax(axis=1)
+        self.food[idx, 0] = cell % self.cols
+        self.food[idx, 1] = cell // self.cols
+
+    def step(self, actions):
+        # actions: (n, 3) one-hot [straight, right, left] or (n,) move indices.
+        # Returns (states, rewards, dones, scores). Finished games are reset
+        # automatically, so their returned state is the first state of the
+        # next game and scores holds the final score of the finished one.
+        actions = np.asarray(actions)
+        if actions.ndim == 2:
+            actions = actions.argmax(axis=1)
+
+        self.frame_iteration += 1
+        self.direction = (self.direction + TURNS[actions]) % 4
+        new_head = self.head + DELTAS[self.direction]
+        x, y = new_head[:, 0], new_head[:, 1]
+
+        # hits boundary or itself (tail included, like SnakeGameAI)
+        dones = self._collides(new_head) | (self.frame_iteration > 100 * (self.length + 1))
+
+        alive = np.flatnonzero(~dones)
+        ate = np.zeros(self.n_envs, dtype=bool)
+        ate[alive] = (new_head[alive] == self.food[alive]).all(axis=1)
+
+        # move: push the new head, pop the tail unless food was eaten
+        self.start[alive] = (self.start[alive] - 1) % self.n_cells
+        self.body[alive, self.start[alive]] = new_head[alive]
+        self.occupied[alive, y[alive], x[alive]] = True
+        self.head[alive] = new_head[alive]
+
+        grow = np.flatnonzero(ate)
+        self.length[grow] += 1
+        moved = alive[~ate[alive]]
+        tail = self.body[moved, (self.start[moved] + self.length[moved]) % self.n_cells]
+        self.occupied[moved, tail[:, 1], tail[:, 0]] = False
+
+        rewards = np.zeros(self.n_envs, dtype=np.float32)
+        rewards[dones] = -10
+        rewards[grow] = 10
+        self.score[grow] += 1
+
+        # a snake that fills the whole board has won
+        full = grow[self.length[grow] == self.n_cells]
+        dones[full] = True
+        grow = grow[self.length[grow] < self.n_cells]
+        if len(grow):
+            self._place_food(grow)
+
+        scores = self.score.copy()
+        if dones.any():
+            self.reset(dones)
+        return self.get_states(), rewards, dones, scores
+
+    def _collides(self, pts):
+        # boundary or body hit for one point per game
+        x, y = pts[:, 0], pts[:, 1]
+        out = (x < 0) | (x >= self.cols) | (y < 0) | (y >= self.rows)
+        hit = out.copy()
+        inside = ~out
+        hit[inside] = self.occupied[self._all[inside], y[inside], x[inside]]
+        return hit
+
+    def get_states(self):
+        # same 11 features, in the same order, as Agent.get_state
+        return state_features(self.direction, self.head, self.food, self.occupied, dtype=np.uint8)